@@ -0,0 +1,50 @@
+"""Counts the TCP connections opened while paging through the users endpoint of a local stub server, comparing
+per-page ``requests.request`` calls against the pooled ``Transport`` used by ``API._request``.
+
+Usage: python -m benchmarks.handshakes [--users 20000] [--page-limit 100]
+"""
+
+import argparse
+import os
+import time
+import requests
+from kb4.api import API
+from .stub_server import StubServer, Tenant
+
+
+def unpooled(url: str, per_page: int) -> int:
+    page, count = 1, per_page
+    while count == per_page:
+        response = requests.request(method="GET", url=f'{url}/users', params={'page': page, 'per_page': per_page},
+                                    headers={'Authorization': 'benchmark'})
+        count = len(response.json())
+        page += 1
+    return page - 1
+
+
+def pooled(url: str, per_page: int) -> int:
+    api = API()
+    api._domain = url
+    api._results_per_page = per_page
+    return len(api._request(method="GET", url="users"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--page-limit', type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ.setdefault('kb4-api-key', 'benchmark')
+
+    with StubServer(Tenant(users=args.users), page_limit=args.page_limit) as stub:
+        for name, run in (('requests.request', unpooled), ('Transport', pooled)):
+            stub.reset_counters()
+            start = time.perf_counter()
+            run(stub.url, args.page_limit)
+            elapsed = time.perf_counter() - start
+            print(f'{name:>18}: {stub.requests:5d} requests, {stub.connections:5d} handshakes, {elapsed:6.2f}s')
+
+
+if __name__ == '__main__':
+    main()
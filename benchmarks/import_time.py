@@ -0,0 +1,81 @@
+"""Measures how long typical entry points take to import, each in a fresh interpreter, and which heavy third-party
+modules they pull in. Pass --importtime to also print the slowest imports reported by ``python -X importtime``.
+
+Usage: python -m benchmarks.import_time [--repeat 7] [--importtime]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = (
+    'import kb4',
+    'from kb4 import KB4',
+    'from kb4 import KB4; KB4.users',
+    'from kb4 import KB4; KB4.training; KB4.phishing',
+    'from kb4 import AsyncKB4',
+)
+
+HEAVY = ('requests', 'urllib3', 'aiohttp', 'sqlite3', 'numpy', 'pyarrow', 'pandas', 'orjson')
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+print(' '.join(name for name in {heavy!r} if name in sys.modules))
+'''
+
+
+def measure(statement: str, repeat: int):
+    runs = [subprocess.run([sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY)],
+                           capture_output=True, text=True, check=True).stdout.splitlines() for _ in range(repeat)]
+    return statistics.median(float(run[0]) for run in runs), runs[0][1] if len(runs[0]) > 1 else ''
+
+
+def top_level_imports(statement: str) -> dict:
+
+    """Returns the cumulative import time (in microseconds) of each top-level import ``python -X importtime``
+    reports for ``statement``."""
+
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                            check=True).stderr
+    imports = {}
+
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  '):
+            imports[name.strip()] = int(cumulative)
+
+    return imports
+
+
+def slowest(statement: str, count: int = 8) -> list:
+
+    """Returns the slowest top-level imports of ``statement``, leaving out the ones done at interpreter startup."""
+
+    startup = top_level_imports('pass')
+    imports = top_level_imports(statement)
+
+    return sorted(((cumulative, name) for name, cumulative in imports.items() if name not in startup),
+                  reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--importtime', action='store_true')
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        seconds, loaded = measure(statement, args.repeat)
+        print(f'{statement:>48}: {seconds * 1000:7.1f} ms  loads: {loaded or "-"}')
+
+        if args.importtime:
+            for cumulative, name in slowest(statement):
+                print(f'{"":>50}{cumulative / 1000:7.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
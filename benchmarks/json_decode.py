@@ -0,0 +1,38 @@
+"""Times decoding a page of users with each installed JSON backend, alone and followed by User hydration.
+
+Usage: python -m benchmarks.json_decode [--page-size 500] [--repeat 200]
+"""
+
+import argparse
+import json
+import timeit
+from kb4 import codec
+from kb4.api import User
+from .stub_server import make_user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    page = json.dumps([make_user(user_id, [user_id % 10 + 1])
+                       for user_id in range(1, args.page_size + 1)]).encode()
+
+    for backend in ['json', 'msgspec', 'orjson']:
+        try:
+            codec.configure_json(backend)
+        except ImportError:
+            print(f'{backend:>8}: not installed')
+            continue
+
+        decode = timeit.timeit(lambda: codec.loads(page), number=args.repeat) / args.repeat
+        hydrate = timeit.timeit(lambda: User.from_dicts(codec.loads(page)), number=args.repeat) / args.repeat
+        print(f'{backend:>8}: decode {decode * 1000:6.2f} ms/page, decode + hydrate {hydrate * 1000:6.2f} ms/page')
+
+    codec.configure_json()
+
+
+if __name__ == '__main__':
+    main()
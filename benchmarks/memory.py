@@ -0,0 +1,51 @@
+"""Measures the per-object memory footprint of the dataclass entities against the compact slotted records, hydrating
+the same generated API payloads into each. No network access is needed.
+
+Usage: python -m benchmarks.memory [--count 50000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from kb4.api import User, TrainingEnrollment, PhishingCampaignRecipient
+from kb4.records import UserRecord, EnrollmentRecord, RecipientRecord
+from .stub_server import make_user, make_enrollment, make_recipient
+
+
+def footprint(datacls, payloads: list) -> float:
+
+    """Returns the number of bytes retained per object after hydrating ``payloads`` into ``datacls``."""
+
+    gc.collect()
+    tracemalloc.start()
+    objects = datacls.from_dicts(payloads)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return retained / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=50000)
+    args = parser.parse_args()
+
+    users = [make_user(user_id, [user_id % 10 + 1]) for user_id in range(1, args.count + 1)]
+    scenarios = (
+        ('users', users, User, UserRecord),
+        ('enrollments', [make_enrollment(i, user) for i, user in enumerate(users, start=1)],
+         TrainingEnrollment, EnrollmentRecord),
+        ('recipients', [make_recipient(i, i % 50 + 1, user) for i, user in enumerate(users, start=1)],
+         PhishingCampaignRecipient, RecipientRecord),
+    )
+
+    for name, payloads, datacls, record_cls in scenarios:
+        before = footprint(datacls, payloads)
+        after = footprint(record_cls, payloads)
+        print(f'{name:>12}: {datacls.__name__:>26} {before:7.0f} B/object, {record_cls.__name__:>16} '
+              f'{after:7.0f} B/object ({1 - after / before:.0%} smaller)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Times loading synthetic risk score histories into a RiskHistory and running each of its rollups.
+
+Usage: python -m benchmarks.risk_analytics [--users 200000] [--samples 24]
+"""
+
+import argparse
+import time
+from kb4.analytics import RiskHistory
+
+
+def timed(label: str, function):
+    started = time.perf_counter()
+    result = function()
+    print(f'{label:>24}: {time.perf_counter() - started:6.3f}s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200000)
+    parser.add_argument('--samples', type=int, default=24)
+    args = parser.parse_args()
+
+    dates = [f'2021-{month:02d}-{day:02d}T00:00:00.000Z' for month in range(1, 13) for day in (1, 15)][:args.samples]
+    users = [{'id': user_id, 'division': f'Division {user_id % 7}', 'manager_email': f'manager{user_id % 500}',
+              'groups': [user_id % 10 + 1, 11 + user_id % 3],
+              'risk_score_history': [{'risk_score': user_id % 100 + sample / 2, 'date': date}
+                                     for sample, date in enumerate(dates) if (user_id + sample) % 3]}
+             for user_id in range(args.users)]
+
+    history = timed('from_records', lambda: RiskHistory.from_records(users))
+    print(f'{"":>24}  {history}')
+
+    timed('latest', history.latest)
+    timed('moving_average(4)', lambda: history.moving_average(4))
+    timed('trend', history.trend)
+    timed('percentiles', history.percentiles)
+    timed('rollup by division', lambda: history.rollup([user['division'] for user in users]))
+    timed('rollup by manager', lambda: history.rollup([user['manager_email'] for user in users]))
+    timed('rollup by group', lambda: history.rollup([user['groups'] for user in users], multi=True))
+
+
+if __name__ == '__main__':
+    main()
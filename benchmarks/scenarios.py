@@ -0,0 +1,103 @@
+"""Times end-to-end client calls against a local stub tenant, reporting wall time, request count and peak traced
+memory per scenario. Each run can be appended to a JSONL history file to compare releases.
+
+Usage: python -m benchmarks.scenarios [--users 20000] [--latency 0.02] [--workers 4] [--history results.jsonl]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from kb4 import invalidate_cache
+from kb4.phishing import Phishing
+from kb4.training import Training
+from kb4.users import Users
+from .stub_server import StubServer, Tenant, pointed_at
+
+
+def scenarios(workers: int) -> dict:
+    return {
+        'users.get': lambda: Users().get(workers=workers),
+        'users.get compact': lambda: Users().get(workers=workers, compact=True),
+        'training.get_enrollments': lambda: Training().get_enrollments(workers=workers),
+        'training.get_enrollments eager': lambda: Training().get_enrollments(workers=workers, eager=True),
+        'phishing.get_campaigns eager': lambda: Phishing().get_campaigns(eager=True),
+        'phishing.get_security_test_results': lambda: Phishing().get_security_test_results(1, workers=workers),
+    }
+
+
+def label() -> str:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(stub: StubServer, scenario, memory: bool = True) -> dict:
+
+    """Runs a scenario from cold caches, timing it untraced, then (if memory is True) runs it again under
+    tracemalloc to measure its peak memory, since tracing slows allocations down."""
+
+    invalidate_cache()
+    stub.reset_counters()
+
+    start = time.perf_counter()
+    result = scenario()
+    seconds = time.perf_counter() - start
+    measured = {'seconds': round(seconds, 4), 'requests': stub.requests, 'objects': len(result), 'peak_mb': None}
+    del result
+
+    if memory:
+        invalidate_cache()
+        tracemalloc.start()
+        scenario()
+        measured['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--training-campaigns', type=int, default=1)
+    parser.add_argument('--phishing-campaigns', type=int, default=2)
+    parser.add_argument('--psts-per-campaign', type=int, default=2)
+    parser.add_argument('--page-limit', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced peak memory runs')
+    parser.add_argument('--only', action='append', help='run only the named scenario (repeatable)')
+    parser.add_argument('--history', help='append the results as one JSON line to this file')
+    parser.add_argument('--label', default=None, help='the release or commit the results belong to')
+    args = parser.parse_args()
+
+    os.environ.setdefault('kb4-api-key', 'benchmark')
+
+    tenant = Tenant(users=args.users, groups=args.groups, training_campaigns=args.training_campaigns,
+                    phishing_campaigns=args.phishing_campaigns, psts_per_campaign=args.psts_per_campaign)
+    results = {}
+
+    with StubServer(tenant, page_limit=args.page_limit, latency=args.latency) as stub, pointed_at(stub.url):
+        for name, scenario in scenarios(args.workers).items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = run(stub, scenario, memory=not args.no_memory)
+            peak = results[name]['peak_mb']
+            print(f'{name:>36}: {results[name]["seconds"]:8.3f}s {results[name]["requests"]:6d} requests '
+                  f'{"-" if peak is None else f"{peak:.2f}":>8} MB peak')
+
+    if args.history:
+        entry = {'label': args.label or label(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'python': platform.python_version(), 'parameters': vars(args), 'results': results}
+        with open(args.history, 'a', encoding='utf-8') as history:
+            history.write(json.dumps(entry) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""A local HTTP stub emulating the paginated KnowBe4 reporting API, used by the benchmark scripts."""
+
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from kb4.config import ClientConfig, get_config, set_config
+
+
+def make_user(user_id: int, group_ids: list) -> dict:
+    return {
+        'id': user_id, 'employee_number': user_id, 'first_name': f'First{user_id}', 'last_name': f'Last{user_id}',
+        'job_title': 'Engineer', 'email': f'user{user_id}@example.com', 'phish_prone_percentage': user_id % 100,
+        'phone_number': '', 'extension': '', 'mobile_phone_number': '', 'location': f'Location {user_id % 7}',
+        'division': f'Division {user_id % 5}', 'manager_name': f'Manager {user_id % 50}',
+        'manager_email': f'manager{user_id % 50}@example.com', 'adi_manageable': False, 'adi_guid': None,
+        'groups': group_ids, 'current_risk_score': float(user_id % 100), 'risk_score_history': [],
+        'aliases': [], 'joined_on': '2020-01-01T00:00:00.000Z', 'last_sign_in': '2021-01-01T00:00:00.000Z',
+        'status': 'active', 'organization': 'Example', 'department': 'IT', 'language': 'en-us', 'comment': '',
+        'employee_start_date': None, 'archived_at': None, 'custom_field_1': None, 'custom_field_2': None,
+        'custom_field_3': None, 'custom_field_4': None, 'custom_date_1': None, 'custom_date_2': None,
+    }
+
+
+def make_group(group_id: int, member_count: int) -> dict:
+    return {
+        'id': group_id, 'name': f'Group {group_id}', 'group_type': 'console_group', 'adi_guid': None,
+        'member_count': member_count, 'current_risk_score': 10.0, 'risk_score_history': [], 'status': 'active',
+    }
+
+
+def make_enrollment(enrollment_id: int, user: dict) -> dict:
+    return {
+        'enrollment_id': enrollment_id, 'content_type': 'Uploaded Policy', 'module_name': 'Security Awareness',
+        'user': {'id': user['id'], 'first_name': user['first_name'], 'last_name': user['last_name'],
+                 'email': user['email']},
+        'campaign_name': 'Annual Training', 'enrollment_date': '2021-01-01T00:00:00.000Z',
+        'start_date': '2021-01-02T00:00:00.000Z', 'completion_date': None,
+        'status': ('Passed', 'In Progress', 'Not Started')[enrollment_id % 3], 'time_spent': enrollment_id % 600,
+        'policy_acknowledged': False,
+    }
+
+
+def make_recipient(recipient_id: int, pst_id: int, user: dict) -> dict:
+    return {
+        'recipient_id': recipient_id, 'pst_id': pst_id,
+        'user': {'id': user['id'], 'active_directory_guid': None, 'first_name': user['first_name'],
+                 'last_name': user['last_name'], 'email': user['email']},
+        'template': {'id': pst_id % 20, 'name': f'Template {pst_id % 20}'},
+        'scheduled_at': '2021-01-01T00:00:00.000Z', 'delivered_at': '2021-01-01T00:01:00.000Z',
+        'opened_at': '2021-01-01T01:00:00.000Z' if recipient_id % 2 else None,
+        'clicked_at': '2021-01-01T01:01:00.000Z' if recipient_id % 5 == 0 else None, 'replied_at': None,
+        'attachment_opened_at': None, 'macro_enabled_at': None, 'data_entered_at': None,
+        'vulnerable_plugins_at': None, 'exploited_at': None,
+        'reported_at': '2021-01-01T02:00:00.000Z' if recipient_id % 7 == 0 else None, 'bounced_at': None,
+        'ip': f'10.0.{recipient_id % 256}.{recipient_id % 251}', 'ip_location': 'Example City',
+        'browser': 'Chrome', 'browser_version': '90.0', 'os': 'Windows',
+    }
+
+
+def make_training_campaign(campaign_id: int, group_ids: list) -> dict:
+    return {
+        'campaign_id': campaign_id, 'name': f'Training Campaign {campaign_id}',
+        'groups': [{'group_id': group_id, 'name': f'Group {group_id}'} for group_id in group_ids], 'status': 'Closed',
+        'modules': [], 'content': [], 'duration_type': 'Specific End Date', 'start_date': '2021-01-01T00:00:00.000Z',
+        'end_date': '2021-02-01T00:00:00.000Z', 'relative_duration': None, 'auto_enroll': False,
+        'allow_multiple_enrollments': False, 'completion_percentage': 50,
+    }
+
+
+def make_pst(pst_id: int, campaign_id: int, group_ids: list, recipients: int) -> dict:
+    return {
+        'campaign_id': campaign_id, 'pst_id': pst_id, 'status': 'Closed', 'name': f'PST {pst_id}',
+        'groups': [{'group_id': group_id, 'name': f'Group {group_id}'} for group_id in group_ids],
+        'phish_prone_percentage': 10, 'started_at': '2021-01-01T00:00:00.000Z', 'duration': 3, 'categories': [],
+        'template': {'id': pst_id % 20, 'name': f'Template {pst_id % 20}'}, 'landing_page': {'id': 1, 'name': 'Oops'},
+        'scheduled_count': recipients, 'delivered_count': recipients, 'opened_count': recipients // 2,
+        'clicked_count': recipients // 5, 'replied_count': 0, 'attachment_open_count': 0, 'macro_enabled_count': 0,
+        'data_entered_count': 0, 'vulnerable_plugin_count': 0, 'exploited_count': 0,
+        'reported_count': recipients // 7, 'bounced_count': 0,
+    }
+
+
+def make_phishing_campaign(campaign_id: int, group_ids: list, psts: list) -> dict:
+    return {
+        'campaign_id': campaign_id, 'name': f'Phishing Campaign {campaign_id}',
+        'groups': [{'group_id': group_id, 'name': f'Group {group_id}'} for group_id in group_ids],
+        'last_phish_prone_percentage': 10, 'last_run': '2021-01-01T00:00:00.000Z', 'status': 'Closed',
+        'hidden': False, 'send_duration': '3 Business Days', 'track_duration': '3 Days', 'frequency': 'Monthly',
+        'difficulty_filter': [1, 2, 3], 'create_date': '2020-12-01T00:00:00.000Z', 'psts_count': len(psts),
+        'psts': [{'pst_id': pst['pst_id'], 'status': pst['status'], 'start_date': pst['started_at']} for pst in psts],
+    }
+
+
+class Tenant:
+
+    """A synthetic tenant. Every user is enrolled in each training campaign, and every phishing security test is
+    sent to every user. Call reindex() after mutating the lists so single-entity lookups see the changes.
+
+    :parameter users: an int, the number of users [Default = 1000]
+    :parameter groups: an int, the number of groups [Default = 10]
+    :parameter training_campaigns: an int, the number of training campaigns [Default = 1]
+    :parameter phishing_campaigns: an int, the number of phishing campaigns [Default = 1]
+    :parameter psts_per_campaign: an int, the number of phishing security tests per campaign [Default = 2]
+    """
+
+    def __init__(self, users: int = 1000, groups: int = 10, training_campaigns: int = 1, phishing_campaigns: int = 1,
+                 psts_per_campaign: int = 2):
+        group_ids = list(range(1, groups + 1))
+        self.groups = [make_group(group_id, users // groups) for group_id in group_ids]
+        self.users = [make_user(user_id, [user_id % groups + 1]) for user_id in range(1, users + 1)]
+        self.training_campaigns = [make_training_campaign(campaign_id, group_ids)
+                                   for campaign_id in range(1, training_campaigns + 1)]
+        self.enrollments = [make_enrollment(campaign_index * users + user_index, user)
+                            for campaign_index in range(training_campaigns)
+                            for user_index, user in enumerate(self.users, start=1)]
+        self.psts = [make_pst(pst_id, (pst_id - 1) // psts_per_campaign + 1, group_ids, users)
+                     for pst_id in range(1, phishing_campaigns * psts_per_campaign + 1)]
+        self.phishing_campaigns = [
+            make_phishing_campaign(campaign_id, group_ids, [pst for pst in self.psts if pst['campaign_id'] == campaign_id])
+            for campaign_id in range(1, phishing_campaigns + 1)]
+        self.recipients = {pst['pst_id']: [make_recipient((pst['pst_id'] - 1) * users + user_index, pst['pst_id'], user)
+                                           for user_index, user in enumerate(self.users, start=1)]
+                           for pst in self.psts}
+        self._entities = None
+
+    def collections(self) -> dict:
+
+        """Maps each paginated path (relative to /v1) to its records."""
+
+        collections = {
+            'users': self.users, 'groups': self.groups, 'training/campaigns': self.training_campaigns,
+            'training/enrollments': self.enrollments, 'phishing/campaigns': self.phishing_campaigns,
+            'phishing/security_tests': self.psts,
+        }
+
+        for campaign in self.phishing_campaigns:
+            collections[f'phishing/campaigns/{campaign["campaign_id"]}/security_tests'] = \
+                [pst for pst in self.psts if pst['campaign_id'] == campaign['campaign_id']]
+
+        for pst_id, recipients in self.recipients.items():
+            collections[f'phishing/security_tests/{pst_id}/recipients'] = recipients
+
+        return collections
+
+    def entities(self) -> dict:
+
+        """Maps each single-entity path prefix (relative to /v1) to its records keyed by ID."""
+
+        if self._entities is None:
+            self.reindex()
+        return self._entities
+
+    def reindex(self):
+        self._entities = {
+            'users': {user['id']: user for user in self.users},
+            'groups': {group['id']: group for group in self.groups},
+            'training/campaigns': {campaign['campaign_id']: campaign for campaign in self.training_campaigns},
+            'training/enrollments': {enrollment['enrollment_id']: enrollment for enrollment in self.enrollments},
+            'phishing/campaigns': {campaign['campaign_id']: campaign for campaign in self.phishing_campaigns},
+            'phishing/security_tests': {pst['pst_id']: pst for pst in self.psts},
+        }
+
+
+class _QuietServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class StubServer:
+
+    """Serves a synthetic tenant under ``/v1`` and counts the requests and TCP connections (handshakes) accepted.
+
+    :parameter tenant: a Tenant, the data served [Default = Tenant()]
+    :parameter page_limit: an int, the largest page size honored, whatever per_page asks for [Default = 500]
+    :parameter etags: a bool, If True, responses carry an ETag and matching If-None-Match requests get a 304
+    [Default = False]
+    :parameter latency: a float, the number of seconds each request is delayed by [Default = 0]
+    """
+
+    def __init__(self, tenant: Tenant = None, page_limit: int = 500, etags: bool = False, latency: float = 0):
+        self.tenant = tenant or Tenant()
+        self.page_limit = page_limit
+        self.etags = etags
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _QuietServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v1'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+
+    def respond(self, path: str, query: dict):
+        relative = '/'.join([part for part in path.split('/') if part][1:])
+        collection = self.tenant.collections().get(relative)
+
+        if collection is not None:
+            page = int(query.get('page', ['1'])[0])
+            per_page = min(int(query.get('per_page', ['100'])[0]), self.page_limit)
+            start = (page - 1) * per_page
+            return 200, collection[start:start + per_page]
+
+        prefix, _, entity_id = relative.rpartition('/')
+        entities = self.tenant.entities().get(prefix)
+
+        if entities is not None and entity_id.isdigit():
+            record = entities.get(int(entity_id))
+            if record is not None:
+                return 200, record
+
+        return 404, {'message': 'Not Found'}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                parsed = urlparse(self.path)
+                status, payload = stub.respond(parsed.path, parse_qs(parsed.query))
+                body = json.dumps(payload).encode()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if stub.etags and status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if stub.etags:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@contextmanager
+def pointed_at(url: str):
+
+    """Makes every API client created inside the block (including the ones used to resolve related entities) talk
+    to ``url`` instead of the KnowBe4 service."""
+
+    previous = get_config()
+    set_config(ClientConfig(api_key=previous.api_key, region=previous.region, base_url=url,
+                            transport=previous._transport, caches=previous._caches))
+
+    try:
+        yield
+    finally:
+        set_config(previous)
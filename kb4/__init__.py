@@ -1 +1,45 @@
-from .kb4 import KB4
+import importlib
+
+# Public names and the submodule defining each. Submodules are imported on first access, so ``import kb4`` stays
+# cheap and requests, aiohttp, sqlite3 etc. are only loaded by the features that use them.
+_EXPORTS = {
+    'KB4': 'kb4',
+    'AsyncKB4': 'aio',
+    'RiskHistory': 'analytics', 'phish_prone_deltas': 'analytics',
+    'UserResolution': 'api', 'configure_user_resolution': 'api',
+    'Cache': 'cache', 'TTLCache': 'cache', 'configure_cache': 'cache', 'set_cache': 'cache',
+    'invalidate_cache': 'cache',
+    'configure_json': 'codec',
+    'REGIONS': 'config', 'ClientConfig': 'config', 'configure_client': 'config', 'get_config': 'config',
+    'set_config': 'config',
+    'ResultTable': 'columnar',
+    'EnrollmentExporter': 'export', 'ExportStats': 'export', 'PhishingExporter': 'export',
+    'PhishingFunnel': 'funnel',
+    'InMemoryMetrics': 'metrics', 'MetricsSink': 'metrics', 'OpenTelemetryMetrics': 'metrics',
+    'PrometheusMetrics': 'metrics', 'get_metrics': 'metrics', 'set_metrics': 'metrics',
+    'TenantPool': 'pool', 'TenantResult': 'pool',
+    'Query': 'query',
+    'UserRecord': 'records', 'EnrollmentRecord': 'records', 'RecipientRecord': 'records',
+    'CampaignCompletion': 'report', 'CompletionReport': 'report', 'CompletionReporter': 'report',
+    'ResponseCache': 'response_cache',
+    'TenantSnapshot': 'snapshot',
+    'RetryPolicy': 'scheduler', 'TokenBucket': 'scheduler',
+    'ChangeEvent': 'sync', 'SyncEngine': 'sync', 'SyncStore': 'sync',
+    'Transport': 'transport', 'configure_transport': 'transport',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
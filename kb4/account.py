@@ -1,10 +1,11 @@
 from .api import API
+from .config import ClientConfig
 
 
 class Account(API):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: ClientConfig = None):
+        super().__init__(config)
         self._domain = f'{self._domain}/account'
 
     def get_information(self, full: bool = False) -> dict:
@@ -23,7 +24,7 @@ class Account(API):
         if full:
             params.update({'full': 'true'})
 
-        return self._request(method="GET", url="")
+        return self._request(method="GET", url="", params=params)
 
     def admins(self) -> list:
 
@@ -0,0 +1,537 @@
+import asyncio
+import os
+import time
+from collections import deque
+from .api import (_group_id, _missing, _pst_id, _store_users, get_user_resolution, Group, User, StorePurchase,
+                  Policy, TrainingCampaign, TrainingEnrollment, PhishingCampaign, PhishingSecurityTest,
+                  PhishingCampaignRecipient)
+from .codec import loads
+from .config import ClientConfig, get_config
+from .exceptions import AuthorizationError
+from .metrics import endpoint, get_metrics
+from .groups import Groups
+from .scheduler import RetryPolicy, TokenBucket
+from .training import Training
+from .users import Users
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncAPI:
+
+    def __init__(self, client: 'AsyncKB4', endpoint: str):
+        self._client = client
+        self._domain = f'{client._domain}/{endpoint}' if endpoint else client._domain
+        self._results_per_page = 500
+
+    def _build_url(self, endpoint: str) -> str:
+        return f'{self._domain}/{endpoint}' if endpoint else self._domain
+
+    def _set_params(self, page: int = 1):
+        return {'page': page, 'per_page': self._results_per_page}
+
+    async def _fetch_page(self, method: str, url: str, params: dict, json: dict = None):
+
+        """Fetches a single page and returns its records along with whether another page may follow."""
+
+        session = await self._client._get_session()
+        retry = self._client._retry
+        metrics = get_metrics()
+        path = endpoint(url)
+        attempt = 0
+
+        while True:
+
+            if self._client._rate_limiter is not None:
+                await asyncio.sleep(self._client._rate_limiter.reserve())
+
+            try:
+                async with self._client._semaphore:
+                    started = time.perf_counter()
+
+                    async with session.request(method=method, url=url, params=params, json=json) as response:
+
+                        metrics.observe('kb4_request_seconds', time.perf_counter() - started, endpoint=path,
+                                        method=method.upper(), status=str(response.status))
+
+                        if response.status == 401:
+                            raise AuthorizationError(f'HTTP Error ({response.status}: Check your API token and try '
+                                                     f'again. Run KB4.reset_auth_token to overwrite the current key.')
+
+                        if retry.should_retry(attempt, response.status):
+                            delay = retry.delay(attempt, response.headers.get('Retry-After'))
+                            reason = str(response.status)
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            metrics.observe('kb4_response_bytes', len(body), endpoint=path)
+                            response = loads(body) if body else None
+                            break
+
+            except aiohttp.ClientConnectionError:
+                metrics.observe('kb4_request_seconds', time.perf_counter() - started, endpoint=path,
+                                method=method.upper(), status='error')
+                if not retry.should_retry(attempt):
+                    raise
+                delay = retry.delay(attempt)
+                reason = 'connection'
+
+            metrics.increment('kb4_retries', endpoint=path, reason=reason)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+        metrics.increment('kb4_pages', endpoint=path)
+
+        if isinstance(response, list):
+            return response, len(response) == self._results_per_page
+        elif isinstance(response, dict):
+            return [response], False
+        else:
+            return [], False
+
+    async def _iter_pages(self, method: str, url: str, params: dict = None, json: dict = None, workers: int = None):
+
+        """Yields the records of each page in order, keeping up to ``workers`` pages in flight."""
+
+        parameters = self._set_params()
+
+        if params:
+            parameters.update(params)
+
+        url = self._build_url(url)
+        next_page = parameters['page']
+        pending = deque()
+
+        def submit():
+            nonlocal next_page
+            pending.append(asyncio.ensure_future(self._fetch_page(method, url, {**parameters, 'page': next_page},
+                                                                  json)))
+            next_page += 1
+
+        for _ in range(max(workers or 1, 1)):
+            submit()
+
+        try:
+            while pending:
+                records, has_next = await pending.popleft()
+                yield records
+
+                if not has_next:
+                    break
+
+                submit()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _request(self, method: str, url: str, params: dict = None, json: dict = None, workers: int = None):
+        return [record async for records in self._iter_pages(method=method, url=url, params=params, json=json,
+                                                             workers=workers)
+                for record in records]
+
+    async def _get_entities(self, url: str, ids: set) -> list:
+        responses = await asyncio.gather(*(self._client._api._request(method="GET", url=f'{url}/{entity_id}')
+                                           for entity_id in ids))
+        return [response[0] for response in responses if response]
+
+    async def _prime_groups(self, records: list):
+
+        """Fills the group cache for every group referenced by ``records`` so hydration does not block the loop."""
+
+        caches = self._client._config.caches
+        cache = caches['groups']
+        missing = _missing(caches, 'groups',
+                           {_group_id(group) for record in records for group in record.get('groups') or []})
+
+        if missing and not cache.is_loaded():
+            groups = await self._client._api._request(method="GET", url='groups')
+            cache.update({group['id']: Group.from_dict(group) for group in groups})
+            cache.mark_loaded()
+            missing = {group_id for group_id in missing if group_id not in cache}
+
+        if missing:
+            groups = await self._get_entities('groups', missing)
+            cache.update({group['id']: Group.from_dict(group) for group in groups})
+
+    async def _prime_users(self, records: list):
+
+        """Fills the user cache with the users referenced by ``records``. Like the sync client, the UserResolution
+        strategy decides whether the full user list is loaded (once per cache TTL, and shared with Users.get) before
+        the users it did not include are fetched concurrently."""
+
+        config = self._client._config
+        cache = config.caches['users']
+        missing = _missing(config.caches, 'users', {record['user']['id'] for record in records if record.get('user')})
+        resolution = get_user_resolution()
+
+        if missing and resolution.use_bulk(len(missing)):
+            for status in ['active', 'archived'] if resolution.include_archived else ['active']:
+                if not cache.is_loaded(status):
+                    users = await self._client._api._request(method="GET", url='users', params={'status': status})
+                    await self._prime_groups(users)
+                    _store_users(User.from_dicts(users, eager=True, config=config), status=status,
+                                 caches=config.caches)
+            missing = {user_id for user_id in missing if user_id not in cache}
+
+        if missing:
+            users = await self._get_entities('users', missing)
+            await self._prime_groups(users)
+            _store_users(User.from_dicts(users, eager=True, config=config), caches=config.caches)
+
+    async def _prime_psts(self, records: list):
+
+        """Fills the phishing security test cache with every PST referenced by ``records``, fetched concurrently."""
+
+        caches = self._client._config.caches
+        cache = caches['psts']
+        missing = _missing(caches, 'psts', {_pst_id(pst) for record in records for pst in record.get('psts') or []})
+
+        if missing:
+            psts = await self._get_entities('phishing/security_tests', missing)
+            await self._prime_groups(psts)
+            psts = PhishingSecurityTest.from_dicts(psts, eager=True, config=self._client._config)
+            cache.update({pst.pst_id: pst for pst in psts})
+
+    async def _hydrate(self, datacls, records: list) -> list:
+
+        if datacls in (User, TrainingCampaign, PhishingSecurityTest, PhishingCampaign):
+            await self._prime_groups(records)
+        if datacls is TrainingEnrollment:
+            await self._prime_users(records)
+        if datacls is PhishingCampaign:
+            await self._prime_psts(records)
+
+        return datacls.from_dicts(records, eager=True, config=self._client._config)
+
+    async def _iter_objects(self, datacls, url: str, params: dict = None, workers: int = None):
+        async for records in self._iter_pages(method="GET", url=url, params=params, workers=workers):
+            for obj in await self._hydrate(datacls, records):
+                yield obj
+
+    async def _get_objects(self, datacls, url: str, params: dict = None, workers: int = None) -> list:
+        return [obj async for obj in self._iter_objects(datacls, url=url, params=params, workers=workers)]
+
+
+class AsyncTraining(AsyncAPI):
+
+    def __init__(self, client: 'AsyncKB4'):
+        super().__init__(client, 'training')
+
+    async def get_store_purchases(self, store_purchase_id: int = None) -> list:
+
+        """Retrieves all store purchases (or a specific purchase if a store_purchase_id is provided).
+
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if store_purchase_id:
+            return await self._get_objects(StorePurchase, url=f'store_purchases/{store_purchase_id}')
+        else:
+            return await self._get_objects(StorePurchase, url='store_purchases')
+
+    async def get_policies(self, policy_id: int = None) -> list:
+
+        """Retrieves all policies (or a specific policy if a policy_id is provided).
+
+        :parameter policy_id: an int, a policy ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if policy_id:
+            return await self._get_objects(Policy, url=f'policies/{policy_id}')
+        else:
+            return await self._get_objects(Policy, url='policies')
+
+    async def get_campaigns(self, campaign_id: int = None) -> list:
+
+        """Retrieves all training campaigns (or a specific training campaign if a campaign_id is provided).
+
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if campaign_id:
+            return await self._get_objects(TrainingCampaign, url=f'campaigns/{campaign_id}')
+        else:
+            return await self._get_objects(TrainingCampaign, url='campaigns')
+
+    async def get_enrollments(self, enrollment_id: int = None, store_purchase_id: int = None,
+                              campaign_id: int = None, user_id: int = None, workers: int = None) -> list:
+
+        """Retrieves all training enrollments (or a specific training enrollment if a enrollment_id is provided).
+
+        :parameter enrollment_id: an int, a training enrollment ID to filter on
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter user_id: an int, a user ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if enrollment_id:
+            return await self._get_objects(TrainingEnrollment, url=f'enrollments/{enrollment_id}')
+        else:
+            return [enrollment async for enrollment in self.iter_enrollments(store_purchase_id=store_purchase_id,
+                                                                             campaign_id=campaign_id,
+                                                                             user_id=user_id, workers=workers)]
+
+    def iter_enrollments(self, store_purchase_id: int = None, campaign_id: int = None, user_id: int = None,
+                         workers: int = None):
+
+        """Yields all training enrollments page by page.
+
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter user_id: an int, a user ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: an async generator of TrainingEnrollment objects
+        :rtype: async_generator
+        """
+
+        params = Training._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                             user_id=user_id)
+
+        return self._iter_objects(TrainingEnrollment, url='enrollments', params=params, workers=workers)
+
+
+class AsyncAccount(AsyncAPI):
+
+    def __init__(self, client: 'AsyncKB4'):
+        super().__init__(client, 'account')
+
+    async def get_information(self, full: bool = False) -> dict:
+
+        """Retrieves account data from you KnowBe4 account.
+
+        :parameter full: a bool, If set to True the entire organization risk score history will be returned.
+        :return: a dict, API response(s)
+        :rtype: dict
+        """
+
+        params = {}
+
+        if full:
+            params.update({'full': 'true'})
+
+        return await self._request(method="GET", url="", params=params)
+
+    async def admins(self) -> list:
+
+        """Retrieves a list of the Organization's KnowBe4 admins.
+
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        response = (await self._request(method="GET", url=""))[0]
+
+        return response.get('admins')
+
+
+class AsyncUsers(AsyncAPI):
+
+    def __init__(self, client: 'AsyncKB4'):
+        super().__init__(client, 'users')
+
+    async def get(self, status: str = 'active', group_id: int = None, user_id: int = None, expand: bool = False,
+                  workers: int = None) -> list:
+
+        """Retrieves all users (or a specific user if a user_id is provided).
+
+        :parameter status: a str, Filter results based on status (active / archived) [Default = active]
+        :parameter group_id: a str, A group ID to filter on
+        :parameter user_id: an int, A user ID to filter on
+        :parameter expand: a bool, If true, expands groups to provide additional details [Default = False]
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if user_id:
+            return await self._get_objects(User, url=f'{user_id}')
+        else:
+            return [user async for user in self.iter(status=status, group_id=group_id, expand=expand,
+                                                     workers=workers)]
+
+    def iter(self, status: str = 'active', group_id: int = None, expand: bool = False, workers: int = None):
+
+        """Yields all users page by page.
+
+        :parameter status: a str, Filter results based on status (active / archived) [Default = active]
+        :parameter group_id: a str, A group ID to filter on
+        :parameter expand: a bool, If true, expands groups to provide additional details [Default = False]
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: an async generator of User objects
+        :rtype: async_generator
+        """
+
+        params = Users._user_params(status=status, group_id=group_id, expand=expand)
+
+        return self._iter_objects(User, url="", params=params, workers=workers)
+
+
+class AsyncGroups(AsyncAPI):
+
+    def __init__(self, client: 'AsyncKB4'):
+        super().__init__(client, 'groups')
+
+    async def get(self, status: str = 'active', group_id: int = None) -> list:
+
+        """Retrieves all groups (or a specific group if a group_id is provided).
+
+        :parameter status: a str, Filter results based on status (active / archived) [Default = active]
+        :parameter group_id: a str, A group ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if group_id:
+            return await self._get_objects(Group, url=f'{group_id}')
+        else:
+            return await self._get_objects(Group, url="", params=Groups._group_params(status=status))
+
+
+class AsyncPhishing(AsyncAPI):
+
+    def __init__(self, client: 'AsyncKB4'):
+        super().__init__(client, 'phishing')
+
+    async def get_campaigns(self, campaign_id: int = None) -> list:
+
+        """Retrieves all phishing campaigns (or a specific phishing campaign if a campaign_id is provided).
+
+        :parameter campaign_id: an int, a phishing campaign ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if campaign_id:
+            return await self._get_objects(PhishingCampaign, url=f'campaigns/{campaign_id}')
+        else:
+            return await self._get_objects(PhishingCampaign, url='campaigns')
+
+    async def get_security_tests(self, campaign_id: int = None, phishing_security_test_id: int = None) -> list:
+
+        """Retrieves all phishing security tests (or the tests of a specific campaign if a campaign_id is provided).
+
+        :parameter campaign_id: an int, a security test campaign ID to filter on
+        :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if campaign_id and phishing_security_test_id:
+            raise ValueError('Please provide either a value for campaign_id or phishing_security_test_id, not both.')
+
+        if campaign_id:
+            return await self._get_objects(PhishingSecurityTest, url=f'campaigns/{campaign_id}/security_tests')
+        elif phishing_security_test_id:
+            return await self._get_objects(PhishingSecurityTest, url=f'security_tests/{phishing_security_test_id}')
+        else:
+            return await self._get_objects(PhishingSecurityTest, url='security_tests')
+
+    async def get_security_test_results(self, phishing_security_test_id: int = None, recipient_id: int = None,
+                                        workers: int = None) -> list:
+
+        """Retrieves all recipients (or a specific recipient if a recipient_id is provided) from a phishing security
+        test.
+
+        :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :parameter recipient_id: an int, a recipient ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a list, API response(s)
+        :rtype: list
+        """
+
+        if not phishing_security_test_id:
+            raise ValueError("A value must be provided for phishing_security_test_id.")
+
+        if recipient_id:
+            return await self._get_objects(
+                PhishingCampaignRecipient, url=f'security_tests/{phishing_security_test_id}/recipients/{recipient_id}')
+        else:
+            return [pcr async for pcr in self.iter_security_test_results(phishing_security_test_id, workers=workers)]
+
+    def iter_security_test_results(self, phishing_security_test_id: int = None, workers: int = None):
+
+        """Yields all recipients from a phishing security test page by page.
+
+        :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: an async generator of PhishingCampaignRecipient objects
+        :rtype: async_generator
+        """
+
+        if not phishing_security_test_id:
+            raise ValueError("A value must be provided for phishing_security_test_id.")
+
+        return self._iter_objects(PhishingCampaignRecipient,
+                                  url=f'security_tests/{phishing_security_test_id}/recipients', workers=workers)
+
+
+class AsyncKB4:
+
+    """An asyncio client exposing the same training / users / groups / phishing / account surface as KB4.
+
+    All sub-clients share one aiohttp connection pool, and at most ``concurrency`` requests are in flight at once.
+    Requires the optional ``aiohttp`` dependency.
+
+    :parameter api_key: a str, a KnowBe4 API token [Default = the kb4-api-key environment variable]
+    :parameter concurrency: an int, the maximum number of concurrent requests [Default = 10]
+    :parameter pool_size: an int, the maximum number of pooled connections [Default = concurrency]
+    :parameter rate_limiter: a TokenBucket, an optional request budget shared by every sub-client [Default = None]
+    :parameter retry: a RetryPolicy, which failures are retried and how long to wait [Default = RetryPolicy()]
+    :parameter config: a ClientConfig, the account's region / base URL and the entity caches to use
+    [Default = the process-wide client config]
+    """
+
+    def __init__(self, api_key: str = None, concurrency: int = 10, pool_size: int = None,
+                 rate_limiter: TokenBucket = None, retry: RetryPolicy = None, config: ClientConfig = None):
+
+        if aiohttp is None:
+            raise ImportError('AsyncKB4 requires aiohttp. Install it with "pip install aiohttp".')
+
+        self._config = config or get_config()
+        self._authToken = api_key or self._config.api_key or os.environ.get("kb4-api-key")
+
+        if not self._authToken:
+            raise AuthorizationError('No API token found. Pass api_key or set the kb4-api-key environment variable.')
+
+        self._domain = self._config.base_url
+        self._pool_size = pool_size or concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rate_limiter = rate_limiter
+        self._retry = retry or RetryPolicy()
+        self._session = None
+
+        self._api = AsyncAPI(self, '')
+        self.training = AsyncTraining(self)
+        self.account = AsyncAccount(self)
+        self.users = AsyncUsers(self)
+        self.groups = AsyncGroups(self)
+        self.phishing = AsyncPhishing(self)
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._pool_size),
+                                                  headers={'Authorization': self._authToken})
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
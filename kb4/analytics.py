@@ -0,0 +1,270 @@
+import warnings
+from .columnar import _require, _sort_keys, _utc
+
+
+def _field(item, name: str):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+def _days(values: list):
+
+    """Parses ISO dates / timestamps (None for missing) into a datetime64[D] array of their UTC dates, parsing each
+    distinct value once."""
+
+    np = _require('numpy')
+    dates = {value: _utc(value).date() for value in set(values) if value}
+    return np.array([dates.get(value) for value in values], dtype='datetime64[D]')
+
+
+class RiskHistory:
+
+    """Risk score histories of many users, groups or accounts as one dense NumPy matrix.
+
+    Row ``i`` holds the history of ``ids[i]`` and column ``j`` the score recorded on ``dates[j]`` (NaN where the
+    entity has no sample on that date). Every rollup below is computed on the whole matrix at once, so the cost of
+    an analysis does not grow with a Python loop per user. Requires the optional ``numpy`` dependency.
+
+    :parameter ids: a numpy.ndarray, the entity of each row
+    :parameter dates: a numpy.ndarray, the sorted datetime64[D] date of each column
+    :parameter scores: a numpy.ndarray, the (len(ids), len(dates)) float score matrix
+    """
+
+    def __init__(self, ids, dates, scores):
+        self.ids = ids
+        self.dates = dates
+        self.scores = scores
+        self._filled = None
+
+    @classmethod
+    def from_records(cls, items, id_field: str = 'id') -> 'RiskHistory':
+
+        """Loads the ``risk_score_history`` of many users or groups in bulk.
+
+        :parameter items: an iterable, User / UserRecord / Group objects or raw JSON records
+        :parameter id_field: a str, the field identifying each item [Default = id]
+        :return: a RiskHistory, one row per item
+        :rtype: RiskHistory
+        """
+
+        np = _require('numpy')
+        ids, counts, positions, scores = [], [], [], []
+
+        # Histories share most of their dates, so each distinct date string is parsed only once.
+        index = {}
+
+        for item in items:
+            ids.append(_field(item, id_field))
+            history = _field(item, 'risk_score_history') or ()
+            counts.append(len(history))
+            positions.extend([index.setdefault(sample.get('date'), len(index)) for sample in history])
+            scores.extend([sample.get('risk_score') for sample in history])
+
+        columns, column_of = np.unique(_days(list(index)), return_inverse=True)
+        positions = column_of[np.asarray(positions, dtype=np.intp)]
+        rows = np.repeat(np.arange(len(ids)), counts)
+        valid = ~np.isnat(columns[positions])
+
+        if len(columns) and np.isnat(columns[-1]):
+            columns = columns[:-1]
+
+        matrix = np.full((len(ids), len(columns)), np.nan)
+        matrix[rows[valid], positions[valid]] = np.array(scores, dtype=float)[valid]
+
+        return cls(np.array(ids, dtype=object), columns, matrix)
+
+    @classmethod
+    def from_account(cls, information) -> 'RiskHistory':
+
+        """Loads the organization risk score history returned by ``Account.get_information(full=True)``.
+
+        :parameter information: a dict or a list of one dict, the account information
+        :return: a RiskHistory, with a single row
+        :rtype: RiskHistory
+        """
+
+        if isinstance(information, list):
+            information = information[0] if information else {}
+
+        return cls.from_records([{'id': 'account', 'risk_score_history': information.get('risk_score_history')}])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self):
+        span = f'{self.dates[0]}..{self.dates[-1]}' if len(self.dates) else 'empty'
+        return f'RiskHistory(entities={len(self.ids)}, dates={len(self.dates)}, span={span})'
+
+    def filled(self):
+
+        """Returns the score matrix with every gap forward-filled from the entity's previous sample, so each column
+        holds the score in effect on that date. Dates before an entity's first sample stay NaN."""
+
+        return self._forward_filled().copy()
+
+    def _forward_filled(self):
+
+        if self._filled is None:
+            np = _require('numpy')
+            scores = self.scores
+
+            if scores.size:
+                last = np.where(np.isnan(scores), 0, np.arange(scores.shape[1]))
+                np.maximum.accumulate(last, axis=1, out=last)
+                self._filled = scores[np.arange(scores.shape[0])[:, None], last]
+            else:
+                self._filled = scores.copy()
+
+        return self._filled
+
+    def latest(self):
+
+        """Returns each entity's most recent score (NaN if it has no history)."""
+
+        np = _require('numpy')
+        return self._forward_filled()[:, -1].copy() if self.scores.shape[1] else np.full(len(self.ids), np.nan)
+
+    def moving_average(self, window: int = 4):
+
+        """Returns the mean of each entity's last ``window`` dates at every date, ignoring dates before its first
+        sample.
+
+        :parameter window: an int, the number of dates averaged [Default = 4]
+        :return: a numpy.ndarray, shaped like ``scores``
+        """
+
+        if window < 1:
+            raise ValueError(f'{window} is an invalid value for window. Possible values: a positive int')
+
+        np = _require('numpy')
+        filled = self._forward_filled()
+        valid = ~np.isnan(filled)
+
+        sums = np.cumsum(np.where(valid, filled, 0.0), axis=1)
+        counts = np.cumsum(valid, axis=1)
+        sums[:, window:] = sums[:, window:] - sums[:, :-window].copy()
+        counts[:, window:] = counts[:, window:] - counts[:, :-window].copy()
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def trend(self):
+
+        """Returns each entity's least-squares trend in score points per day over its recorded samples (NaN with
+        fewer than two samples)."""
+
+        np = _require('numpy')
+        scores = self.scores
+        valid = ~np.isnan(scores)
+        days = (self.dates - self.dates[0]).astype(float) if len(self.dates) else np.zeros(0)
+
+        x = np.where(valid, days, 0.0)
+        y = np.where(valid, scores, 0.0)
+        n = valid.sum(axis=1)
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        denominator = n * (x * x).sum(axis=1) - sx * sx
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(denominator > 0, (n * (x * y).sum(axis=1) - sx * sy) / denominator, np.nan)
+
+    def delta(self, periods: int = 1):
+
+        """Returns the change of each entity's (forward-filled) score over the previous ``periods`` dates."""
+
+        if periods < 1:
+            raise ValueError(f'{periods} is an invalid value for periods. Possible values: a positive int')
+
+        np = _require('numpy')
+        filled = self._forward_filled()
+        delta = np.full_like(filled, np.nan)
+        delta[:, periods:] = filled[:, periods:] - filled[:, :-periods]
+        return delta
+
+    def percentiles(self, q=(50, 90, 99)):
+
+        """Returns the given percentiles of the score in effect across all entities at every date.
+
+        :parameter q: a sequence, the percentiles to compute [Default = (50, 90, 99)]
+        :return: a numpy.ndarray, shaped (len(q), len(dates))
+        """
+
+        np = _require('numpy')
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanpercentile(self._forward_filled(), q, axis=0)
+
+    def rollup(self, keys, multi: bool = False) -> 'RiskHistory':
+
+        """Averages the forward-filled scores of the entities sharing a key, e.g. users per division or manager.
+
+        :parameter keys: a sequence, the key of each row (rows with a None key are skipped)
+        :parameter multi: a bool, If True, each key is a list of keys (e.g. a user's group IDs) and the row counts
+        towards every one of them [Default = False]
+        :return: a RiskHistory, one row per distinct key
+        :rtype: RiskHistory
+        """
+
+        np = _require('numpy')
+        rows, inverse, index = [], [], {}
+
+        for row, key in enumerate(keys):
+            for value in (key or ()) if multi else (key,):
+                if value is not None:
+                    rows.append(row)
+                    inverse.append(index.setdefault(value, len(index)))
+
+        groups = np.empty(len(index), dtype=object)
+        groups[:] = list(index)
+
+        if not len(groups):
+            return RiskHistory(groups, self.dates, np.empty((0, len(self.dates))))
+
+        groups, inverse = _sort_keys(groups, np.asarray(inverse, dtype=np.intp))
+
+        # One weighted bincount per date: vectorized over entities, and histories have far fewer dates than users.
+        filled = self._forward_filled()
+        rows = np.asarray(rows, dtype=np.intp)
+        sums = np.zeros((len(groups), len(self.dates)))
+        counts = np.zeros((len(groups), len(self.dates)))
+
+        for column in range(len(self.dates)):
+            values = filled[rows, column]
+            valid = ~np.isnan(values)
+            sums[:, column] = np.bincount(inverse[valid], weights=values[valid], minlength=len(groups))
+            counts[:, column] = np.bincount(inverse[valid], minlength=len(groups))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return RiskHistory(groups, self.dates, np.where(counts > 0, sums / counts, np.nan))
+
+
+def phish_prone_deltas(psts) -> dict:
+
+    """Orders phishing security tests by start within each campaign and computes the change in phish-prone
+    percentage from one test to the next.
+
+    :parameter psts: an iterable, PhishingSecurityTest objects or raw JSON records
+    :return: a dict of NumPy arrays (campaign_id, pst_id, started_at, phish_prone_percentage, delta), sorted by
+    campaign and start; delta is NaN for each campaign's first test
+    :rtype: dict
+    """
+
+    np = _require('numpy')
+    psts = list(psts)
+
+    campaigns = np.array([_field(pst, 'campaign_id') for pst in psts], dtype=object)
+    started = [_field(pst, 'started_at') for pst in psts]
+    started = np.array([_utc(value) if value else None for value in started], dtype='datetime64[s]')
+    percentages = np.array([_field(pst, 'phish_prone_percentage') for pst in psts], dtype=float)
+
+    _, campaign_index = np.unique(campaigns.astype(str), return_inverse=True)
+    order = np.lexsort((started, campaign_index))
+
+    campaign_index, percentages = campaign_index[order], percentages[order]
+    delta = np.full(len(order), np.nan)
+    delta[1:] = np.where(campaign_index[1:] == campaign_index[:-1], np.diff(percentages), np.nan)
+
+    return {'campaign_id': campaigns[order],
+            'pst_id': np.array([_field(pst, 'pst_id') for pst in psts], dtype=object)[order],
+            'started_at': started[order],
+            'phish_prone_percentage': percentages,
+            'delta': delta}
@@ -1,19 +1,24 @@
 import os
-import requests
-from dataclasses import dataclass, field, asdict
+import time
+from collections import deque
+from copy import deepcopy
+from dataclasses import dataclass, field, fields, asdict
 from .exceptions import AuthorizationError
-
-_GROUP_CACHE = {}
-_PSTS_CACHE = {}
-_USER_CACHE = {}
+from .codec import loads
+from .columnar import ResultTable
+from .config import ClientConfig, get_config
+from .metrics import endpoint, get_metrics
 
 
 class API:
 
-    def __init__(self):
-        self._authToken = os.environ.get("kb4-api-key")
-        self._domain = "https://us.api.knowbe4.com/v1"
+    def __init__(self, config: ClientConfig = None):
+        self._config = config or get_config()
+        self._authToken = self._config.api_key or os.environ.get("kb4-api-key")
+        self._domain = self._config.base_url
         self._results_per_page = 500
+        self._transport = self._config.transport
+        self._caches = self._config.caches
 
     def _build_url(self, endpoint: str) -> str:
         return f'{self._domain}/{endpoint}'
@@ -37,9 +42,72 @@ class API:
         if not response:
             return None
         else:
-            return response.json()
+            return loads(response.content)
+
+    def _send(self, method: str, url: str, params: dict, json: dict, headers: dict):
+
+        """Sends a single request and returns its decoded JSON body, consulting the transport's response cache (if
+        one is configured) for GET requests."""
+
+        import requests
+
+        cache = self._transport.response_cache if method.upper() == 'GET' and json is None else None
+        entry = None
+
+        if cache is not None:
+            key = cache.key(url, params, self._authToken)
+            entry = cache.get(key)
+
+            if entry is not None and cache.is_fresh(entry):
+                get_metrics().increment('kb4_response_cache', endpoint=endpoint(url), result='hit')
+                return cache.decode(entry)
+
+            headers = {**headers, **cache.conditional_headers(entry)}
+
+        try:
+            response = self._transport.request(method=method, url=url, params=params, json=json, headers=headers)
+            response.raise_for_status()
+
+        except requests.exceptions.HTTPError as http_err:
+
+            response = http_err.response
+
+            if response.status_code == 401:
+                raise AuthorizationError(f'HTTP Error ({response.status_code}: Check your API token and try '
+                                         f'again. Run KB4.reset_auth_token to overwrite the current key.')
+
+            else:
+                response.raise_for_status()
+
+        if cache is not None:
+            if response.status_code == 304 and entry is not None:
+                get_metrics().increment('kb4_response_cache', endpoint=endpoint(url), result='revalidated')
+                cache.touch(key)
+                return cache.decode(entry)
 
-    def _request(self, method: str, url: str, params: dict = None, json: dict = None, headers: dict = None):
+            get_metrics().increment('kb4_response_cache', endpoint=endpoint(url), result='miss')
+            cache.store(key, response)
+
+        return self._json(response)
+
+    def _fetch_page(self, method: str, url: str, params: dict, json: dict, headers: dict):
+
+        """Fetches a single page and returns its records along with whether another page may follow."""
+
+        response = self._send(method, url, params, json, headers)
+        get_metrics().increment('kb4_pages', endpoint=endpoint(url))
+
+        if isinstance(response, list):
+            return response, len(response) == self._results_per_page
+        elif isinstance(response, dict):
+            return [response], False
+        else:
+            return [], False
+
+    def _iter_pages(self, method: str, url: str, params: dict = None, json: dict = None, headers: dict = None,
+                    workers: int = None):
+
+        """Returns a generator yielding the records of each page as soon as it arrives."""
 
         parameters = self._set_params()
 
@@ -50,59 +118,502 @@ class API:
         headers = self._set_headers()
         url = self._build_url(url)
 
-        results = []
-
         def pagination_handler():
 
             has_next = True
-            terminate = False
 
-            while has_next and not terminate:
+            while has_next:
+                records, has_next = self._fetch_page(method, url, parameters, json, headers)
+                yield records
+                parameters['page'] += 1
+
+        def concurrent_pagination_handler():
+
+            # Speculatively request a window of upcoming pages and consume them in order, so results keep the
+            # same ordering as the sequential handler. Pages past the first short page are discarded.
+            next_page = parameters['page']
+            pending = deque()
+
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+
+                def submit():
+                    nonlocal next_page
+                    pending.append(executor.submit(self._fetch_page, method, url, {**parameters, 'page': next_page},
+                                                   json, headers))
+                    next_page += 1
+
+                for _ in range(workers):
+                    submit()
 
                 try:
-                    response = requests.request(method=method, url=url, params=parameters, json=json, headers=headers)
-                    response.raise_for_status()
+                    while pending:
+                        records, has_next = pending.popleft().result()
+                        yield records
+
+                        if not has_next:
+                            break
+
+                        submit()
+                finally:
+                    for future in pending:
+                        future.cancel()
+
+        if workers and workers > 1:
+            return concurrent_pagination_handler()
+        else:
+            return pagination_handler()
+
+    def _iter_request(self, method: str, url: str, params: dict = None, json: dict = None, headers: dict = None,
+                      workers: int = None):
+
+        """Returns a generator yielding records one at a time, holding at most one page in memory."""
+
+        return (record for records in self._iter_pages(method=method, url=url, params=params, json=json,
+                                                       headers=headers, workers=workers)
+                for record in records)
+
+    def _request(self, method: str, url: str, params: dict = None, json: dict = None, headers: dict = None,
+                 workers: int = None):
+
+        return list(self._iter_request(method=method, url=url, params=params, json=json, headers=headers,
+                                       workers=workers))
+
+    def _table(self, url: str, params: dict = None, workers: int = None, transform=None) -> ResultTable:
+
+        """Returns a ResultTable built straight from the raw JSON pages, without hydrating any dataclasses."""
+
+        return ResultTable.from_pages(self._iter_pages(method="GET", url=url, params=params, workers=workers),
+                                      transform=transform)
+
+
+class _Unresolved:
+
+    __slots__ = ('ref',)
+
+    def __init__(self, ref):
+        self.ref = ref
+
+
+class _Batch(list):
+
+    """The objects hydrated from one result set, along with the ClientConfig their relations are resolved with."""
+
+    __slots__ = ('config',)
+
+    def __init__(self, objs: list, config: ClientConfig = None):
+        super().__init__(objs)
+        self.config = config
+
+
+class _Relation:
+
+    """A lazily resolved dataclass field.
+
+    The raw reference assigned in ``__init__`` is kept until the attribute is first read. The first read resolves
+    the reference for every object hydrated in the same result set at once, using ``resolver`` to map a list of raw
+    references (and the batch's ClientConfig) to a list of resolved values."""
+
+    def __init__(self, name: str, resolver):
+        self._name = name
+        self._resolver = resolver
+
+    def __get__(self, obj, owner=None):
+
+        if obj is None:
+            return self
+
+        if isinstance(obj.__dict__[self._name], _Unresolved):
+            batch = obj.__dict__.get('_batch', [obj])
+            pending = [sibling for sibling in batch if isinstance(sibling.__dict__.get(self._name), _Unresolved)]
+            resolved = self._resolver([sibling.__dict__[self._name].ref for sibling in pending],
+                                      getattr(batch, 'config', None))
+            for sibling, value in zip(pending, resolved):
+                sibling.__dict__[self._name] = value
+
+            # Once every relation of the batch is resolved, the siblings no longer need each other. Dropping the
+            # references lets a single kept object be collected (and pickled) without the whole result set.
+            others = [name for name in type(obj)._relations if name != self._name]
+            if not any(isinstance(sibling.__dict__.get(name), _Unresolved) for sibling in batch for name in others):
+                for sibling in batch:
+                    sibling.__dict__.pop('_batch', None)
+
+        return obj.__dict__[self._name]
+
+    def __set__(self, obj, value):
+        obj.__dict__[self._name] = _Unresolved(value)
+
+
+def _relation_ref(obj, name: str):
+
+    """Returns the raw reference of a relation without resolving it, or its value if it is already resolved."""
+
+    value = obj.__dict__.get(name)
+    return value.ref if isinstance(value, _Unresolved) else value
+
+
+def _resolve_relations(objs: list, config: ClientConfig = None):
+
+    """Resolves the relations of objects hydrated in different result sets (e.g. cached users) in one pass, as
+    from_dicts(eager=True) does for a single result set."""
+
+    relations = type(objs[0])._relations if objs else ()
+    pending = [obj for obj in objs if any(isinstance(obj.__dict__.get(name), _Unresolved) for name in relations)]
+
+    if not pending:
+        return
+
+    batch = _Batch(pending, config)
+    for obj in batch:
+        obj.__dict__['_batch'] = batch
+
+    for name in relations:
+        unresolved = next((obj for obj in batch if isinstance(obj.__dict__.get(name), _Unresolved)), None)
+        if unresolved is not None:
+            getattr(unresolved, name)
+
+
+def _missing(caches, name: str, keys) -> set:
+
+    """Returns the keys missing from one of the entity caches, recording the cache hits and misses."""
+
+    keys = set(keys) - {0, None}
+    missing = caches[name].missing(keys)
+
+    metrics = get_metrics()
+    metrics.increment('kb4_entity_cache', len(keys) - len(missing), cache=name, result='hit')
+    metrics.increment('kb4_entity_cache', len(missing), cache=name, result='miss')
+
+    return missing
+
+
+def _partition(caches, name: str, keys) -> tuple:
+
+    """Returns (found, missing): the cached entries among ``keys`` keyed by key, and the keys that must be fetched.
+    The entries are read up front, so a bounded cache evicting them while the missing keys are stored cannot lose
+    them."""
+
+    keys = set(keys) - {0, None}
+    hits = keys - _missing(caches, name, keys)
+    cache = caches[name]
+    found = {key: cache.peek(key) for key in hits}
+    found = {key: value for key, value in found.items() if value is not None}
+    return found, keys - found.keys()
+
+
+def _fetch_each(api: 'API', endpoint: str, ids: set, workers: int = 8) -> list:
+
+    """Fetches ``endpoint/{id}`` for every id in a single concurrent sweep and returns the records."""
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(ids))) as executor:
+        responses = executor.map(lambda entity_id: api._request(method="GET", url=f'{endpoint}/{entity_id}'), ids)
+        return [record for response in responses for record in response]
+
+
+def _group_id(group):
+    if isinstance(group, Group):
+        return group.id
+    elif isinstance(group, dict):
+        return group.get("group_id")
+    return group
+
+
+def _prefetch_groups(group_ids: set, config: ClientConfig = None) -> dict:
+
+    """Fills the groups cache for every uncached group id, using a single bulk groups fetch (once per cache TTL)
+    followed by at most one concurrent sweep for groups the bulk fetch did not return (e.g. archived groups).
+    Returns the requested groups that were found or fetched, keyed by id."""
+
+    config = config or get_config()
+    cache = config.caches['groups']
+    found, missing = _partition(config.caches, 'groups', group_ids)
+
+    if not missing:
+        return found
+
+    api = API(config)
+
+    if not cache.is_loaded():
+        groups = {group['id']: Group.from_dict(group) for group in api._request(method="GET", url=f'groups')}
+        cache.update(groups)
+        cache.mark_loaded()
+        found.update({group_id: groups[group_id] for group_id in missing if group_id in groups})
+        missing = missing - found.keys()
+
+    if missing:
+        groups = {group['id']: Group.from_dict(group) for group in _fetch_each(api, 'groups', missing)}
+        cache.update(groups)
+        found.update(groups)
+
+    return found
+
+
+def _resolve_group_lists(refs: list, config: ClientConfig = None) -> list:
+
+    """Maps lists of group references (ids, dicts or Group objects) to cached Group objects, fetching every uncached
+    group across all lists at once."""
+
+    config = config or get_config()
+    group_ids = [[_group_id(group) for group in groups or []] for groups in refs]
+
+    found = _prefetch_groups({group_id for groups in group_ids for group_id in groups}, config)
+
+    return [[found[group_id] for group_id in groups if group_id in found] for groups in group_ids]
+
+
+def _resolve_groups(groups: list, config: ClientConfig = None) -> list:
+    return _resolve_group_lists([groups], config)[0]
+
+
+def _user_id(user):
+    if isinstance(user, User):
+        return user.id
+    elif isinstance(user, dict):
+        return user.get("id")
+    return user
+
+
+class UserResolution:
+
+    """How user references on TrainingEnrollment objects are resolved.
+
+    :parameter strategy: a str, 'ids' fetches only the referenced users, 'bulk' loads the full user list, and 'auto'
+    loads the full list only when at least ``bulk_threshold`` referenced users are uncached [Default = auto]
+    :parameter include_archived: a bool, If True, bulk loads also fetch the archived user list [Default = False]
+    :parameter bulk_threshold: an int, the number of uncached users from which 'auto' switches to a bulk load
+    [Default = 200]
+    :parameter workers: an int, the number of concurrent requests used to fetch individual users [Default = 8]
+    """
+
+    def __init__(self, strategy: str = 'auto', include_archived: bool = False, bulk_threshold: int = 200,
+                 workers: int = 8):
 
-                except requests.exceptions.HTTPError as http_err:
+        if strategy not in ['auto', 'ids', 'bulk']:
+            raise ValueError(f'{strategy} is an invalid value for strategy. Possible values: '
+                             f'["auto", "ids", "bulk"]')
 
-                    response = http_err.response
+        self.strategy = strategy
+        self.include_archived = include_archived
+        self.bulk_threshold = bulk_threshold
+        self.workers = workers
 
-                    if response.status_code == 401:
-                        raise AuthorizationError(f'HTTP Error ({response.status_code}: Check your API token and try '
-                                                 f'again. Run KB4.reset_auth_token to overwrite the current key.')
+    def use_bulk(self, missing: int) -> bool:
+        return self.strategy == 'bulk' or (self.strategy == 'auto' and missing >= self.bulk_threshold)
 
-                    else:
-                        response.raise_for_status()
 
-                else:
+_USER_RESOLUTION = UserResolution()
 
-                    # Extract JSON from response and append values to results
-                    response = self._json(response)
 
-                    if isinstance(response, list):
-                        results.extend(response)
-                    elif isinstance(response, dict):
-                        results.append(response)
+def get_user_resolution() -> UserResolution:
+    return _USER_RESOLUTION
 
-                    if len(response) != self._results_per_page:
-                        has_next, terminate = False, True
 
-                    else:
-                        has_next = True
-                        parameters['page'] += 1
+def configure_user_resolution(strategy: str = None, include_archived: bool = None, bulk_threshold: int = None,
+                              workers: int = None):
 
-        pagination_handler()
+    """Updates how user references on TrainingEnrollment objects are resolved. See UserResolution."""
 
-        return results
+    global _USER_RESOLUTION
+
+    current = _USER_RESOLUTION
+    _USER_RESOLUTION = UserResolution(
+        strategy=strategy if strategy is not None else current.strategy,
+        include_archived=include_archived if include_archived is not None else current.include_archived,
+        bulk_threshold=bulk_threshold if bulk_threshold is not None else current.bulk_threshold,
+        workers=workers if workers is not None else current.workers)
+
+
+def _store_users(users: list, status: str = None, caches=None):
+
+    """Caches hydrated users. If ``status`` is given, ``users`` is the complete user list for that status, and is
+    recorded so the list is not downloaded again while the cache entry is valid."""
+
+    cache = (caches or get_config().caches)['users']
+    cache.update({user.id: user for user in users})
+
+    if status:
+        cache.mark_loaded(status, [user.id for user in users])
+
+
+def _cached_users(status: str, caches=None):
+
+    """Returns the complete cached user list for ``status``, or None if it is not cached (or partially evicted)."""
+
+    cache = (caches or get_config().caches)['users']
+    user_ids = cache.loaded_keys(status)
+
+    if user_ids is None:
+        return None
+
+    users = [cache.peek(user_id) for user_id in user_ids]
+
+    return None if None in users else users
+
+
+def _resolve_users(refs: list, config: ClientConfig = None) -> list:
+
+    """Maps user references to cached User objects. Depending on the UserResolution strategy, uncached users are
+    either fetched individually in a single concurrent sweep, or by loading the full user list (once per cache TTL,
+    and shared with Users.get) and sweeping only the users it did not include."""
+
+    config = config or get_config()
+    cache = config.caches['users']
+    found, missing = _partition(config.caches, 'users', {_user_id(user) for user in refs})
+
+    if missing:
+
+        api = API(config)
+        resolution = get_user_resolution()
+
+        if resolution.use_bulk(len(missing)):
+            for status in ['active', 'archived'] if resolution.include_archived else ['active']:
+                if not cache.is_loaded(status):
+                    users = User.from_dicts(api._request(method="GET", url=f'users', params={'status': status}),
+                                            config=config)
+                    _store_users(users, status=status, caches=config.caches)
+                    found.update({user.id: user for user in users if user.id in missing})
+            missing = missing - found.keys()
+
+        if missing:
+            users = User.from_dicts(_fetch_each(api, 'users', missing, workers=resolution.workers), config=config)
+            _store_users(users, caches=config.caches)
+            found.update({user.id: user for user in users})
+
+    return [found.get(_user_id(user)) for user in refs]
+
+
+def _pst_id(pst):
+    if isinstance(pst, PhishingSecurityTest):
+        return pst.pst_id
+    elif isinstance(pst, dict):
+        return pst.get("pst_id")
+    return pst
+
+
+def _resolve_pst_lists(refs: list, config: ClientConfig = None) -> list:
+
+    """Maps lists of PST references to cached PhishingSecurityTest objects, fetching every uncached PST across all
+    lists in a single concurrent sweep."""
+
+    config = config or get_config()
+    pst_ids = [[_pst_id(pst) for pst in psts or []] for psts in refs]
+
+    found, missing = _partition(config.caches, 'psts', {pst_id for psts in pst_ids for pst_id in psts})
+
+    if missing:
+        psts = PhishingSecurityTest.from_dicts(_fetch_each(API(config), 'phishing/security_tests', missing),
+                                               config=config)
+        config.caches['psts'].update({pst.pst_id: pst for pst in psts})
+        found.update({pst.pst_id: pst for pst in psts})
+
+    return [[found[pst_id] for pst_id in psts if pst_id in found] for psts in pst_ids]
+
+
+def _enrollment_status(status: str, time_spent: int) -> str:
+    if status == 'In Progress' and time_spent == 0:
+        return "Not Started"
+    elif status == 'Passed':
+        return "Completed"
+    elif status == 'Past Due' and time_spent > 0:
+        return "In Progress"
+    elif status == 'Past Due' and time_spent == 0:
+        return "Not Started"
+    return status
+
+
+_INIT_FIELDS = {}
+
+# CPython shares the key table of instance dicts between instances of a class, unless an instance has more attributes
+# than this. Below it, __init__ builds smaller objects than a copied dict, so the direct path is only used above it.
+_SHARED_KEYS_LIMIT = 30
+
+
+def _init_fields(cls):
+
+    """Returns the init field names of a dataclass if its records can skip __init__, else None."""
+
+    if cls not in _INIT_FIELDS:
+        names = frozenset(f.name for f in fields(cls) if f.init)
+        _INIT_FIELDS[cls] = names if len(names) > _SHARED_KEYS_LIMIT else None
+    return _INIT_FIELDS[cls]
 
 
 @dataclass()
 class Datacls:
     pass
 
+    _relations = ()
+
+    @classmethod
+    def from_dict(cls, obj, eager: bool = False, config: ClientConfig = None):
+        return cls.from_dicts([obj], eager=eager, config=config)[0]
+
     @classmethod
-    def from_dict(cls, obj):
-        return cls(**obj)
+    def from_dicts(cls, objs, eager: bool = False, config: ClientConfig = None) -> list:
+
+        """Hydrates a whole result set. Related objects are resolved in bulk for the entire set, either on first
+        access or, if eager is True, immediately, using ``config`` (the default client config if None)."""
+
+        # Records of wide dataclasses carrying exactly the init fields skip the generated __init__ and its keyword
+        # matching; anything else (missing or unexpected keys) goes through __init__ so it fails the same way.
+        started = time.perf_counter()
+        init_fields = _init_fields(cls)
+
+        if init_fields is None:
+            batch = [cls(**obj) for obj in objs]
+        else:
+            batch = [cls._construct(obj) if obj.keys() == init_fields else cls(**obj) for obj in objs]
+        get_metrics().observe('kb4_hydration_seconds', time.perf_counter() - started, entity=cls.__name__)
+
+        if cls._relations:
+            batch = _Batch(batch, config)
+            for obj in batch:
+                obj.__dict__['_batch'] = batch
+            if eager and batch:
+                for name in cls._relations:
+                    getattr(batch[0], name)
+
+        return batch
+
+    @classmethod
+    def _construct(cls, obj: dict):
+
+        instance = object.__new__(cls)
+        values = dict(obj)
+
+        for name in cls._relations:
+            values[name] = _Unresolved(values[name])
+
+        instance.__dict__ = values
+
+        if hasattr(instance, '__post_init__'):
+            instance.__post_init__()
+
+        return instance
+
+    def __getstate__(self):
+
+        # The result set an unresolved object came from is not part of its state. An unpickled object resolves its
+        # relations on its own, with the process-wide client config.
+        state = self.__dict__.copy()
+        state.pop('_batch', None)
+        return state
+
+    def __deepcopy__(self, memo):
+
+        # A copy resolves its relations on its own, but with the same ClientConfig as the original.
+        copied = object.__new__(type(self))
+        memo[id(self)] = copied
+        copied.__dict__.update(deepcopy(self.__getstate__(), memo))
+
+        batch = self.__dict__.get('_batch')
+        if batch is not None:
+            copied.__dict__['_batch'] = _Batch([copied], batch.config)
+
+        return copied
 
     def to_dict(self):
         return asdict(self)
@@ -140,44 +651,15 @@ class TrainingEnrollment(Datacls):
     user_status: str = field(init=False)
     user: dict = field(repr=False)
 
+    _relations = ('user',)
+
     def __post_init__(self):
-        self.user = self.get_user()
         self.status = self.set_status()
-        self.email = self.user.email
-        self.firstname = self.user.first_name
-        self.lastname = self.user.last_name
-        self.location = self.user.location
-        self.division = self.user.division
-        self.user_status = self.user.status
 
     def set_status(self):
-        if self.status == 'In Progress' and self.time_spent == 0:
-            self.status = "Not Started"
-        elif self.status == 'Passed':
-            self.status = "Completed"
-        elif self.status == 'Past Due' and self.time_spent > 0:
-            self.status = "In Progress"
-        elif self.status == 'Past Due' and self.time_spent == 0:
-            self.status = "Not Started"
+        self.status = _enrollment_status(self.status, self.time_spent)
         return self.status
 
-    def get_user(self):
-
-        api = API()
-
-        user_id = self.user.get("id")
-
-        if not _USER_CACHE:
-            users = api._request(method="GET", url=f'users')
-            _USER_CACHE.update({user['id']: User.from_dict(user) for user in users})
-
-        if user_id in _USER_CACHE.keys():
-            return _USER_CACHE[user_id]
-        else:
-            user_obj = User.from_dict(api._request(method="GET", url=f'users/{user_id}')[0])
-            _USER_CACHE[user_id] = user_obj
-            return user_obj
-
 
 @dataclass()
 class StorePurchase(Datacls):
@@ -221,37 +703,7 @@ class TrainingCampaign(Datacls):
     allow_multiple_enrollments: bool
     completion_percentage: int
 
-    def __post_init__(self):
-        self.groups = self.set_groups()
-
-    def set_groups(self):
-
-        api = API()
-
-        group_objs = []
-
-        for group in self.groups:
-
-            if not _GROUP_CACHE:
-                groups = api._request(method="GET", url=f'groups')
-                _GROUP_CACHE.update({group['id']: Group.from_dict(group) for group in groups})
-
-            if isinstance(group, int):
-                pass
-            elif isinstance(group, dict):
-                group = group.get("group_id")
-
-            if group in _GROUP_CACHE.keys():
-                group_objs.append(_GROUP_CACHE[group])
-            else:
-                if group != 0:
-                    group_obj = api._request(method="GET", url=f'groups/{group}')[0]
-                    _GROUP_CACHE.update({group_obj.id: group_obj})
-                    group_objs.append(group_obj)
-                else:
-                    pass
-
-        return group_objs
+    _relations = ('groups',)
 
 
 @dataclass()
@@ -292,37 +744,7 @@ class User(Datacls):
     custom_date_1: str
     custom_date_2: str
 
-    def __post_init__(self):
-        self.groups = self.set_groups()
-
-    def set_groups(self):
-
-        api = API()
-
-        group_objs = []
-
-        for group in self.groups:
-
-            if not _GROUP_CACHE:
-                groups = api._request(method="GET", url=f'groups')
-                _GROUP_CACHE.update({group['id']: Group.from_dict(group) for group in groups})
-
-            if isinstance(group, int):
-                pass
-            elif isinstance(group, dict):
-                group = group.get("group_id")
-
-            if group in _GROUP_CACHE.keys():
-                group_objs.append(_GROUP_CACHE[group])
-            else:
-                if group != 0:
-                    group_obj = api._request(method="GET", url=f'groups/{group}')[0]
-                    _GROUP_CACHE.update({group_obj.id: group_obj})
-                    group_objs.append(group_obj)
-                else:
-                    pass
-
-        return group_objs
+    _relations = ('groups',)
 
 
 @dataclass()
@@ -351,37 +773,7 @@ class PhishingSecurityTest(Datacls):
     reported_count: int
     bounced_count: int
 
-    def __post_init__(self):
-        self.groups = self.set_groups()
-
-    def set_groups(self):
-
-        api = API()
-
-        group_objs = []
-
-        for group in self.groups:
-
-            if not _GROUP_CACHE:
-                groups = api._request(method="GET", url=f'groups')
-                _GROUP_CACHE.update({group['id']: Group.from_dict(group) for group in groups})
-
-            if isinstance(group, int):
-                pass
-            elif isinstance(group, dict):
-                group = group.get("group_id")
-
-            if group in _GROUP_CACHE.keys():
-                group_objs.append(_GROUP_CACHE[group])
-            else:
-                if group != 0:
-                    group_obj = api._request(method="GET", url=f'groups/{group}')[0]
-                    _GROUP_CACHE.update({group_obj.id: group_obj})
-                    group_objs.append(group_obj)
-                else:
-                    pass
-
-        return group_objs
+    _relations = ('groups',)
 
 
 @dataclass()
@@ -401,72 +793,7 @@ class PhishingCampaign(Datacls):
     psts_count: bool
     psts: list = field(init=True)
 
-    def __post_init__(self):
-        self.groups = self.set_groups()
-        self.psts = self.set_phishing_security_tests()
-
-    def set_groups(self):
-
-        api = API()
-
-        group_objs = []
-
-        for group in self.groups:
-
-            if not _GROUP_CACHE:
-                groups = api._request(method="GET", url=f'groups')
-                _GROUP_CACHE.update({group['id']: Group.from_dict(group) for group in groups})
-
-            if isinstance(group, int):
-                pass
-            elif isinstance(group, dict):
-                group = group.get("group_id")
-
-            if group in _GROUP_CACHE.keys():
-                group_objs.append(_GROUP_CACHE[group])
-            else:
-                if group != 0:
-                    group_obj = api._request(method="GET", url=f'groups/{group}')[0]
-                    _GROUP_CACHE.update({group_obj.id: group_obj})
-                    group_objs.append(group_obj)
-                else:
-                    pass
-
-        return group_objs
-
-    def set_phishing_security_tests(self):
-
-        api = API()
-
-        psts = []
-
-        for pst in self.psts:
-
-            if isinstance(pst, int):
-                pst_id = pst
-                if pst in _PSTS_CACHE:
-                    psts.append(_GROUP_CACHE[pst])
-                else:
-                    if pst != 0:
-                        pst_obj = PhishingSecurityTest.from_dict(
-                            api._request(method="GET", url=f'phishing/security_tests/{pst}')[0])
-                        psts.append(pst_obj)
-                        _PSTS_CACHE[pst_id] = pst_obj
-                    else:
-                        pass
-            elif isinstance(pst, dict):
-                pst_id = pst.get("pst_id")
-                if pst_id in _PSTS_CACHE:
-                    psts.append(_PSTS_CACHE[pst_id])
-                else:
-                    if pst_id != 0:
-                        psts_obj = PhishingSecurityTest.from_dict(
-                            api._request(method="GET", url=f'phishing/security_tests/{pst.get("pst_id")}')[0])
-                        psts.append(psts_obj)
-                        _PSTS_CACHE[pst_id] = psts_obj
-                    else:
-                        pass
-        return psts
+    _relations = ('groups', 'psts')
 
 
 @dataclass()
@@ -492,3 +819,25 @@ class PhishingCampaignRecipient(Datacls):
     browser: str
     browser_version: str
     os: str
+
+
+# Relationship fields are resolved lazily, in bulk across each hydrated result set. The descriptors are attached
+# after class creation so the dataclass fields keep their original signatures.
+TrainingCampaign.groups = _Relation('groups', _resolve_group_lists)
+User.groups = _Relation('groups', _resolve_group_lists)
+PhishingSecurityTest.groups = _Relation('groups', _resolve_group_lists)
+PhishingCampaign.groups = _Relation('groups', _resolve_group_lists)
+PhishingCampaign.psts = _Relation('psts', _resolve_pst_lists)
+TrainingEnrollment.user = _Relation('user', _resolve_users)
+
+
+def _user_field(name: str) -> property:
+    return property(lambda self: getattr(self.user, name))
+
+
+TrainingEnrollment.email = _user_field('email')
+TrainingEnrollment.firstname = _user_field('first_name')
+TrainingEnrollment.lastname = _user_field('last_name')
+TrainingEnrollment.location = _user_field('location')
+TrainingEnrollment.division = _user_field('division')
+TrainingEnrollment.user_status = _user_field('status')
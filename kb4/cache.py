@@ -0,0 +1,284 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class Cache(ABC):
+
+    """The interface every entity cache implements. Subclass it to plug in a different backend with
+    ``set_cache``; every method must be implemented."""
+
+    @abstractmethod
+    def configure(self, maxsize: int = None, ttl: float = None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def peek(self, key, default=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, mapping: dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    def missing(self, keys) -> set:
+        raise NotImplementedError
+
+    @abstractmethod
+    def invalidate(self, key):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_loaded(self, scope: str = 'all') -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def loaded_keys(self, scope: str = 'all'):
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_loaded(self, scope: str = 'all', keys=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __contains__(self, key) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class TTLCache(Cache):
+
+    """A thread-safe, size-capped LRU cache whose entries expire ``ttl`` seconds after they are stored.
+
+    :parameter maxsize: an int, the maximum number of entries kept; the least recently used are evicted first
+    [Default = None, unbounded]
+    :parameter ttl: a float, the number of seconds an entry stays valid [Default = None, never expires]
+    """
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data = OrderedDict()
+        self._loaded = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize: int = None, ttl: float = None):
+
+        """Updates the size cap and/or TTL. Entries over the new size cap are evicted immediately.
+
+        :parameter maxsize: an int, the maximum number of entries kept
+        :parameter ttl: a float, the number of seconds an entry stays valid
+        """
+
+        with self._lock:
+            if maxsize is not None:
+                self._maxsize = maxsize
+            if ttl is not None:
+                self._ttl = ttl
+            self._evict()
+
+    def _expired(self, expires_at) -> bool:
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def _lookup(self, key):
+
+        entry = self._data.get(key)
+
+        if entry is None:
+            return False, None
+
+        value, expires_at = entry
+
+        if self._expired(expires_at):
+            del self._data[key]
+            return False, None
+
+        self._data.move_to_end(key)
+        return True, value
+
+    def _evict(self):
+        while self._maxsize is not None and len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+
+        with self._lock:
+            found, value = self._lookup(key)
+
+            if found:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            return default
+
+    def peek(self, key, default=None):
+
+        with self._lock:
+            found, value = self._lookup(key)
+            return value if found else default
+
+    def update(self, mapping: dict):
+
+        expires_at = time.monotonic() + self._ttl if self._ttl is not None else None
+
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (value, expires_at)
+                self._data.move_to_end(key)
+            self._evict()
+
+    def __setitem__(self, key, value):
+        self.update({key: value})
+
+    def missing(self, keys) -> set:
+
+        """Returns the keys that are not cached, counting a hit or a miss for each key looked up."""
+
+        keys = set(keys)
+
+        with self._lock:
+            missing = {key for key in keys if not self._lookup(key)[0]}
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            return missing
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._loaded.clear()
+
+    def is_loaded(self, scope: str = 'all') -> bool:
+
+        """Returns True if a full entity list (e.g. all active users) was loaded into the cache under ``scope`` and
+        has not expired since."""
+
+        with self._lock:
+            loaded = self._loaded.get(scope)
+            return loaded is not None and not self._expired(loaded[0])
+
+    def loaded_keys(self, scope: str = 'all'):
+
+        """Returns the keys recorded when ``scope`` was loaded, or None if it is not loaded."""
+
+        with self._lock:
+            return self._loaded[scope][1] if self.is_loaded(scope) else None
+
+    def mark_loaded(self, scope: str = 'all', keys=None):
+
+        """Records that a full entity list was loaded under ``scope``, optionally remembering its keys in order."""
+
+        with self._lock:
+            expires_at = time.monotonic() + self._ttl if self._ttl is not None else None
+            self._loaded[scope] = (expires_at, tuple(keys) if keys is not None else None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self._maxsize, 'ttl': self._ttl, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._lookup(key)[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class CacheRegistry:
+
+    """Holds one cache per hydrated entity type (groups, users and psts)."""
+
+    def __init__(self, **caches):
+        self._caches = caches
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'CacheRegistry':
+        return cls(groups=TTLCache(maxsize=10000, ttl=3600),
+                   users=TTLCache(maxsize=100000, ttl=900),
+                   psts=TTLCache(maxsize=10000, ttl=3600))
+
+    def __getitem__(self, name: str) -> Cache:
+        return self._caches[name]
+
+    def set(self, name: str, cache: Cache):
+        with self._lock:
+            self._caches[name] = cache
+
+    def invalidate(self, name: str = None, key=None):
+        names = [name] if name else list(self._caches)
+        for cache_name in names:
+            if key is None:
+                self._caches[cache_name].clear()
+            else:
+                self._caches[cache_name].invalidate(key)
+
+    def stats(self) -> dict:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+
+_DEFAULT_CACHES = CacheRegistry.default()
+
+
+def get_caches() -> CacheRegistry:
+    return _DEFAULT_CACHES
+
+
+def configure_cache(name: str, maxsize: int = None, ttl: float = None):
+
+    """Updates the size cap and/or TTL of one of the process-wide entity caches.
+
+    :parameter name: a str, the entity cache to configure (groups / users / psts)
+    :parameter maxsize: an int, the maximum number of entries kept
+    :parameter ttl: a float, the number of seconds an entry stays valid
+    """
+
+    _DEFAULT_CACHES[name].configure(maxsize=maxsize, ttl=ttl)
+
+
+def set_cache(name: str, cache: Cache):
+
+    """Replaces one of the process-wide entity caches with a custom Cache implementation.
+
+    :parameter name: a str, the entity cache to replace (groups / users / psts)
+    :parameter cache: a Cache, the replacement cache
+    """
+
+    _DEFAULT_CACHES.set(name, cache)
+
+
+def invalidate_cache(name: str = None, key=None):
+
+    """Drops cached entities so they are fetched again on next use.
+
+    :parameter name: a str, the entity cache to invalidate (groups / users / psts) [Default = all caches]
+    :parameter key: an int, a single entity ID to drop [Default = every entry]
+    """
+
+    _DEFAULT_CACHES.invalidate(name=name, key=key)
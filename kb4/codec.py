@@ -0,0 +1,64 @@
+import json
+
+_BACKEND = None
+_LOADS = None
+
+
+def _load(backend: str):
+
+    """Imports a decoder backend and returns its decode function."""
+
+    if backend == 'orjson':
+        import orjson
+        return orjson.loads
+    elif backend == 'msgspec':
+        import msgspec
+        return msgspec.json.Decoder().decode
+    else:
+        return json.loads
+
+
+def loads(data):
+
+    """Decodes a JSON document (bytes or str) with the configured backend."""
+
+    if _LOADS is None:
+        configure_json()
+
+    return _LOADS(data)
+
+
+def get_json_backend() -> str:
+
+    if _BACKEND is None:
+        configure_json()
+
+    return _BACKEND
+
+
+def configure_json(backend: str = 'auto'):
+
+    """Selects the library used to decode API responses. By default orjson is used if it is installed, then msgspec,
+    falling back to the standard library json module. The backend is imported on first use.
+
+    :parameter backend: a str, the decoder to use (auto / orjson / msgspec / json) [Default = auto]
+    """
+
+    global _BACKEND, _LOADS
+
+    if backend not in ['auto', 'orjson', 'msgspec', 'json']:
+        raise ValueError(f'{backend} is an invalid value for backend. Possible values: '
+                         f'["auto", "orjson", "msgspec", "json"]')
+
+    if backend == 'auto':
+        for candidate in ['orjson', 'msgspec', 'json']:
+            try:
+                _LOADS, _BACKEND = _load(candidate), candidate
+                return
+            except ImportError:
+                pass
+
+    try:
+        _LOADS, _BACKEND = _load(backend), backend
+    except ImportError:
+        raise ImportError(f'The {backend} JSON backend is not installed. Install it with "pip install {backend}".')
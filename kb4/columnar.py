@@ -0,0 +1,217 @@
+import importlib
+import importlib.util
+from datetime import datetime, timezone
+
+
+def _require(module: str, package: str = None):
+
+    """Imports an optional dependency on first use, raising ImportError with an install hint if it is missing."""
+
+    package = package or module
+
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f'This export requires {package}. Install it with "pip install {package}".')
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _get(record: dict, path: tuple):
+
+    """Returns the value at ``path`` in a raw record, e.g. ('user', 'email'), or None if any part is missing."""
+
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def _sort_keys(keys, inverse) -> tuple:
+
+    """Renumbers distinct keys (an object array) and each row's key index (``inverse``) in sorted key order when the
+    keys are comparable, so grouped results come back sorted. Returns the (keys, inverse) pair."""
+
+    np = _require('numpy')
+
+    try:
+        order = np.argsort(keys)
+    except TypeError:
+        return keys, inverse
+
+    rank = np.empty(len(keys), dtype=np.intp)
+    rank[order] = np.arange(len(keys))
+    return keys[order], rank[inverse]
+
+
+def _utc(value: str) -> datetime:
+
+    """Parses an ISO 8601 date or timestamp into a naive datetime; values with an offset (or Z) are converted to
+    UTC first, so they can be stored in a NumPy datetime64 array, which has no time zones."""
+
+    parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return parsed
+
+
+class ResultTable:
+
+    """A column-oriented result set built directly from raw API pages.
+
+    Each record's values are appended to one list per column as its page arrives, and the page's JSON objects are
+    dropped right after, so no per-row dataclass is ever instantiated. Nested objects (e.g. an enrollment's ``user``
+    or a recipient's ``template``) are flattened one level into ``<field>_<key>`` columns. Columns are plain Python
+    lists; NumPy, pyarrow and pandas are only needed by the matching export methods.
+
+    :parameter columns: a dict, column names mapped to equally long lists of values [Default = no columns]
+    """
+
+    def __init__(self, columns: dict = None):
+        self._columns = columns or {}
+        self._length = len(next(iter(self._columns.values()))) if self._columns else 0
+
+    @classmethod
+    def from_pages(cls, pages, transform=None) -> 'ResultTable':
+
+        """Builds a table from an iterable of pages, each a list of raw JSON records.
+
+        :parameter pages: an iterable, pages of raw records as yielded by ``API._iter_pages``
+        :parameter transform: a callable, an optional function applied to each flattened row (a dict) before it is
+        appended, e.g. to normalize enrollment statuses [Default = None]
+        :return: a ResultTable
+        """
+
+        table = cls()
+
+        for records in pages:
+            table.extend(records, transform=transform)
+
+        return table
+
+    def extend(self, records: list, transform=None):
+
+        """Appends raw JSON records, adding new columns (back-filled with None) as new keys appear."""
+
+        columns = self._columns
+
+        for record in records:
+            row = self._flatten(record)
+
+            if transform is not None:
+                row = transform(row)
+
+            for name in row:
+                if name not in columns:
+                    columns[name] = [None] * self._length
+
+            for name, values in columns.items():
+                values.append(row.get(name))
+
+            self._length += 1
+
+    @staticmethod
+    def _flatten(record: dict) -> dict:
+
+        row = {}
+
+        for name, value in record.items():
+            if isinstance(value, dict):
+                for key, nested in value.items():
+                    row[f'{name}_{key}'] = nested
+            else:
+                row[name] = value
+
+        return row
+
+    @property
+    def columns(self) -> list:
+        return list(self._columns)
+
+    def column(self, name: str) -> list:
+        return self._columns[name]
+
+    def __getitem__(self, name: str) -> list:
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self):
+        return f'ResultTable(rows={self._length}, columns={self.columns})'
+
+    def rows(self):
+
+        """Yields each row as a dict, for callers that still need row-wise access."""
+
+        names = self.columns
+        for values in zip(*(self._columns[name] for name in names)):
+            yield dict(zip(names, values))
+
+    def to_numpy(self, name: str):
+
+        """Returns one column as a NumPy array. Numeric columns without missing values get a numeric dtype, numeric
+        columns with missing values become float with NaN, and everything else is an object array.
+
+        :parameter name: a str, the column to convert
+        :return: a numpy.ndarray
+        """
+
+        np = _require('numpy')
+        values = self._columns[name]
+        present = [value for value in values if value is not None]
+
+        if present and all(isinstance(value, bool) for value in present):
+            if len(present) == len(values):
+                return np.array(values, dtype=bool)
+        elif present and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+            if len(present) == len(values):
+                return np.array(values)
+            return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+        return np.array(values, dtype=object)
+
+    def to_arrow(self):
+
+        """Returns the table as a ``pyarrow.Table``, letting pyarrow infer each column's type.
+
+        :return: a pyarrow.Table
+        """
+
+        pa = _require('pyarrow')
+        return pa.table({name: pa.array(values) for name, values in self._columns.items()})
+
+    def to_pandas(self):
+
+        """Returns the table as a ``pandas.DataFrame``. The conversion goes through pyarrow when it is installed and
+        through NumPy arrays otherwise.
+
+        :return: a pandas.DataFrame
+        """
+
+        pd = _require('pandas')
+
+        if _installed('pyarrow'):
+            return self.to_arrow().to_pandas()
+        elif _installed('numpy'):
+            return pd.DataFrame({name: self.to_numpy(name) for name in self._columns})
+        else:
+            return pd.DataFrame(self._columns)
+
+    def to_parquet(self, path: str, compression: str = 'snappy'):
+
+        """Writes the table to a Parquet file.
+
+        :parameter path: a str, the file to write
+        :parameter compression: a str, the Parquet compression codec [Default = snappy]
+        """
+
+        _require('pyarrow.parquet', 'pyarrow').write_table(self.to_arrow(), path, compression=compression)
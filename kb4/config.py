@@ -0,0 +1,90 @@
+from .cache import CacheRegistry, get_caches
+from .transport import Transport, get_transport
+
+# Base URL of the reporting API in each KnowBe4 region.
+REGIONS = {
+    'us': 'https://us.api.knowbe4.com/v1',
+    'eu': 'https://eu.api.knowbe4.com/v1',
+    'ca': 'https://ca.api.knowbe4.com/v1',
+    'uk': 'https://uk.api.knowbe4.com/v1',
+    'de': 'https://de.api.knowbe4.com/v1',
+}
+
+
+class ClientConfig:
+
+    """Which KnowBe4 account a client talks to, and the transport and caches it uses.
+
+    Clients built from the same config share its transport (connection pool, rate budget, retries) and entity
+    caches; objects they return resolve their relations through the same config.
+
+    :parameter api_key: a str, the account's reporting API token [Default = the kb4-api-key environment variable]
+    :parameter region: a str, the account's region (us / eu / ca / uk / de) [Default = us]
+    :parameter base_url: a str, overrides the region's API base URL, e.g. for a proxy [Default = None]
+    :parameter transport: a Transport, the HTTP layer to use [Default = the process-wide transport]
+    :parameter caches: a CacheRegistry, the group / user / PST caches to use [Default = the process-wide caches]
+    """
+
+    def __init__(self, api_key: str = None, region: str = 'us', base_url: str = None, transport: Transport = None,
+                 caches: CacheRegistry = None):
+
+        if region not in REGIONS:
+            raise ValueError(f'{region} is an invalid value for region. Possible values: {list(REGIONS)}')
+
+        self.api_key = api_key
+        self.region = region
+        self.base_url = (base_url or REGIONS[region]).rstrip('/')
+        self._transport = transport
+        self._caches = caches
+
+    @property
+    def transport(self) -> Transport:
+        return self._transport or get_transport()
+
+    @property
+    def caches(self) -> CacheRegistry:
+        return self._caches or get_caches()
+
+    def __repr__(self):
+        return f'ClientConfig(region={self.region!r}, base_url={self.base_url!r})'
+
+
+_DEFAULT_CONFIG = ClientConfig()
+
+
+def get_config() -> ClientConfig:
+    return _DEFAULT_CONFIG
+
+
+def configure_client(api_key: str = None, region: str = None, base_url: str = None):
+
+    """Updates the process-wide client config used when no ClientConfig is passed. Clients created afterwards,
+    relation lookups and the sub-clients of KB4 objects created without a config use the new settings. A transport
+    or CacheRegistry installed with ``set_config`` is kept.
+
+    :parameter api_key: a str, the reporting API token
+    :parameter region: a str, the account's region (us / eu / ca / uk / de)
+    :parameter base_url: a str, overrides the region's API base URL
+    """
+
+    global _DEFAULT_CONFIG
+
+    current = _DEFAULT_CONFIG
+    region = region if region is not None else current.region
+
+    if base_url is None and region == current.region:
+        base_url = current.base_url
+
+    _DEFAULT_CONFIG = ClientConfig(api_key=api_key if api_key is not None else current.api_key, region=region,
+                                   base_url=base_url, transport=current._transport, caches=current._caches)
+
+
+def set_config(config: ClientConfig):
+
+    """Replaces the process-wide client config used when no ClientConfig is passed, like ``configure_client``.
+
+    :parameter config: a ClientConfig, the new default config
+    """
+
+    global _DEFAULT_CONFIG
+    _DEFAULT_CONFIG = config
@@ -0,0 +1,491 @@
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from .columnar import ResultTable, _require
+from .config import ClientConfig
+from .phishing import Phishing
+from .training import Training
+
+# rows counts every row in the file, including rows written by an earlier run that this one resumed, while
+# rows_per_second only covers this run. psts is 0 for enrollment exports.
+ExportStats = namedtuple('ExportStats', ['rows', 'psts', 'seconds', 'rows_per_second'])
+
+# The flattened columns of each export, in file order. Nested objects that are null on some records would otherwise
+# leave their columns out of a header or schema inferred from the first rows. Keys the API adds beyond these are
+# appended as extra columns.
+RECIPIENT_COLUMNS = ('campaign_id', 'recipient_id', 'pst_id', 'user_id', 'user_active_directory_guid',
+                     'user_first_name', 'user_last_name', 'user_email', 'template_id', 'template_name', 'scheduled_at',
+                     'delivered_at', 'opened_at', 'clicked_at', 'replied_at', 'attachment_opened_at',
+                     'macro_enabled_at', 'data_entered_at', 'vulnerable_plugins_at', 'exploited_at', 'reported_at',
+                     'bounced_at', 'ip', 'ip_location', 'browser', 'browser_version', 'os')
+ENROLLMENT_COLUMNS = ('enrollment_id', 'content_type', 'module_name', 'user_id', 'user_first_name', 'user_last_name',
+                      'user_email', 'campaign_name', 'enrollment_date', 'start_date', 'completion_date', 'status',
+                      'time_spent', 'policy_acknowledged')
+
+_DONE = object()
+_FAILED = object()
+
+
+def _new_columns(rows: list, known: set) -> list:
+
+    """Returns the keys of ``rows`` missing from ``known``, in first-seen order, and adds them to it. Keys that are
+    null on every row (e.g. a null nested object, which flattens to a single key) are not columns yet."""
+
+    new = [key for key in dict.fromkeys(key for row in rows for key, value in row.items() if value is not None)
+           if key not in known]
+    known.update(new)
+    return new
+
+
+class _CsvWriter:
+
+    resumable = True
+
+    def __init__(self, path: str, columns: list, state: dict = None):
+
+        self._path = path
+
+        if state:
+            # Drop anything written after the last checkpoint, so resumed pages are never written twice.
+            self._file = open(path, 'r+', newline='', encoding='utf-8')
+            self._file.seek(state['offset'])
+            self._file.truncate()
+            self._fields, self._header = state['fields'], state['header']
+        else:
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._fields, self._header = list(columns), len(columns)
+            csv.writer(self._file).writerow(self._fields)
+
+        self._known = set(self._fields)
+        self._writer = csv.DictWriter(self._file, fieldnames=self._fields, extrasaction='ignore')
+
+    def write(self, rows: list):
+
+        # Columns missing from the header are appended to the rows that have them, and added to the header by finish.
+        new = _new_columns(rows, self._known)
+
+        if new:
+            self._fields = [*self._fields, *new]
+            self._writer = csv.DictWriter(self._file, fieldnames=self._fields, extrasaction='ignore')
+
+        self._writer.writerows(rows)
+
+    def state(self) -> dict:
+        self._file.flush()
+        return {'offset': self._file.tell(), 'fields': self._fields, 'header': self._header}
+
+    def finish(self):
+
+        """Rewrites the header, and pads the rows written before, if columns were added after it was written."""
+
+        if len(self._fields) == self._header:
+            return
+
+        self._file.close()
+        temporary = f'{self._path}.tmp'
+        width = len(self._fields)
+
+        with open(self._path, newline='', encoding='utf-8') as source, \
+                open(temporary, 'w', newline='', encoding='utf-8') as target:
+            rows = csv.reader(source)
+            next(rows, None)
+            writer = csv.writer(target)
+            writer.writerow(self._fields)
+            writer.writerows(row + [''] * (width - len(row)) for row in rows)
+
+        os.replace(temporary, self._path)
+        self._header = width
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlWriter:
+
+    resumable = True
+
+    def __init__(self, path: str, columns: list, state: dict = None):
+
+        if state:
+            self._file = open(path, 'r+', encoding='utf-8')
+            self._file.seek(state['offset'])
+            self._file.truncate()
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: list):
+        self._file.writelines(json.dumps(row, default=str) + '\n' for row in rows)
+
+    def state(self) -> dict:
+        self._file.flush()
+        return {'offset': self._file.tell()}
+
+    def finish(self):
+        pass
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+
+    # A Parquet file is only readable once its footer is written, so an interrupted file cannot be continued.
+    resumable = False
+
+    def __init__(self, path: str, columns: list, state: dict = None):
+        self._pa = _require('pyarrow')
+        self._pq = _require('pyarrow.parquet', 'pyarrow')
+        self._path = path
+        self._columns = list(columns)
+        self._known = set(columns)
+        self._segments = []
+        self._writer = None
+        self._schema = None
+
+    def _open(self, rows: list):
+
+        """Starts a segment whose schema covers every column seen so far. Types inferred for earlier segments are
+        kept; columns that are empty so far have no type yet and are stored as strings (timestamps)."""
+
+        pa = self._pa
+        types = {f.name: f.type for f in self._schema or [] if not pa.types.is_string(f.type)}
+
+        # Inferred column by column over every row: Table.from_pylist only infers the keys of the first row.
+        for name in self._columns:
+            if name not in types:
+                inferred = pa.array([row.get(name) for row in rows]).type
+                types[name] = pa.string() if pa.types.is_null(inferred) else inferred
+
+        self._schema = pa.schema([(name, types[name]) for name in self._columns])
+
+        if self._writer is not None:
+            self._writer.close()
+
+        segment = f'{self._path}.{len(self._segments)}.part' if self._segments else self._path
+        self._segments.append(segment)
+        self._writer = self._pq.ParquetWriter(segment, self._schema)
+
+    def write(self, rows: list):
+
+        # A Parquet schema cannot grow, so rows bringing new columns start a new segment; finish merges them.
+        new = _new_columns(rows, self._known)
+        self._columns.extend(new)
+
+        if self._writer is None or new:
+            self._open(rows)
+
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def finish(self):
+
+        if self._writer is None:
+            self._open([])
+
+        self._writer.close()
+        self._writer = None
+
+        if len(self._segments) == 1:
+            return
+
+        pa, schema = self._pa, self._schema
+        temporary = f'{self._path}.tmp'
+
+        with self._pq.ParquetWriter(temporary, schema) as writer:
+            for segment in self._segments:
+                for batch in self._pq.ParquetFile(segment).iter_batches():
+                    table = pa.Table.from_batches([batch])
+                    writer.write_table(pa.table({f.name: table[f.name].cast(f.type) if f.name in table.column_names else
+                                                 pa.nulls(len(table), f.type) for f in schema}, schema=schema))
+
+        os.replace(temporary, self._path)
+
+        for segment in self._segments[1:]:
+            os.remove(segment)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+_WRITERS = {'csv': _CsvWriter, 'jsonl': _JsonlWriter, 'parquet': _ParquetWriter}
+
+
+class _Checkpoint:
+
+    """The progress of an export, kept next to its output in ``<path>.checkpoint``: the last page written of each
+    stream (an endpoint and its parameters), the rows written and the writer's state after the last of them. The
+    file is replaced atomically, so it always describes a complete prefix of the output."""
+
+    def __init__(self, path: str):
+        self.path = f'{path}.checkpoint'
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, snapshot: str):
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(snapshot)
+        os.replace(temporary, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _stream_key(url: str, params: dict = None) -> str:
+    return f'{url}?{urlencode(sorted((params or {}).items()))}'
+
+
+class _Exporter:
+
+    """Writes the pages of one or more list endpoints (streams) to a file, fetching up to ``workers`` streams
+    concurrently. CSV and JSONL exports are checkpointed so an interrupted export can be resumed."""
+
+    def __init__(self, workers: int = 4, page_workers: int = None, progress=None, progress_interval: float = 1,
+                 checkpoint_interval: float = 1):
+        self.workers = workers
+        self.page_workers = page_workers
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.checkpoint_interval = checkpoint_interval
+
+    def _export(self, path: str, format: str, resume: bool, streams: list, psts: int, columns: tuple) -> ExportStats:
+
+        """Writes ``streams``, a list of (client, url, params, extra columns) tuples, to ``path``, starting with
+        ``columns``."""
+
+        format = format or path.rsplit('.', 1)[-1].lower()
+        format = 'jsonl' if format in ['json', 'ndjson'] else format
+
+        if format not in _WRITERS:
+            raise ValueError(f'{format} is an invalid value for format. Possible values: {list(_WRITERS)}')
+
+        writer_cls = _WRITERS[format]
+
+        if resume and not writer_cls.resumable:
+            raise ValueError(f'{format} exports cannot be resumed. Possible values: '
+                             f'{[name for name, writer in _WRITERS.items() if writer.resumable]}')
+
+        start = time.perf_counter()
+        checkpoint = _Checkpoint(path) if writer_cls.resumable else None
+        keys = [_stream_key(url, params) for _, url, params, _ in streams]
+        state = checkpoint.load() if resume else None
+
+        if state is not None and (state['format'] != format or sorted(state['streams']) != sorted(keys)):
+            raise ValueError(f'{checkpoint.path} is the checkpoint of a different export. Delete it or export '
+                             f'without resume')
+
+        if state is None:
+            state = {'format': format, 'rows': 0, 'writer': None,
+                     'streams': {key: {'page': 0, 'done': False} for key in keys}}
+
+        writer = writer_cls(path, columns, state['writer'])
+        resumed = state['rows']
+
+        try:
+            self._write(writer, dict(zip(keys, streams)), state, checkpoint, psts, resumed, start)
+            writer.finish()
+        finally:
+            writer.close()
+
+        if checkpoint is not None:
+            checkpoint.remove()
+
+        return self._stats(state['rows'], psts, state['rows'] - resumed, start)
+
+    def _write(self, writer, streams: dict, state: dict, checkpoint: _Checkpoint, psts: int, resumed: int,
+               start: float):
+
+        pages = queue.Queue(maxsize=self.workers * 2)
+        stop = threading.Event()
+        progress = state['streams']
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def fetch(key: str, client, url: str, params: dict, extra: dict):
+
+            page, outcome = progress[key]['page'], _FAILED
+
+            try:
+                # Continue after the last page the checkpoint recorded as written.
+                for records in client._iter_pages(method="GET", url=url, params={**(params or {}), 'page': page + 1},
+                                                  workers=self.page_workers):
+                    if stop.is_set():
+                        return
+                    page += 1
+                    put((key, page, [{**extra, **ResultTable._flatten(record)} for record in records]))
+                outcome = _DONE
+            finally:
+                put((key, outcome, None))
+
+        pending = [key for key in streams if not progress[key]['done']]
+        remaining, snapshot, saved_at, reported_at = len(pending), None, start, start
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(fetch, key, *streams[key]) for key in pending]
+
+            try:
+                while remaining:
+                    key, page, rows = pages.get()
+
+                    if page is _DONE or page is _FAILED:
+                        remaining -= 1
+                        progress[key]['done'] = page is _DONE
+                    else:
+                        if rows:
+                            writer.write(rows)
+                            state['rows'] += len(rows)
+                        progress[key]['page'] = page
+
+                    if checkpoint is not None:
+                        state['writer'] = writer.state()
+                        snapshot = json.dumps(state)
+
+                        if page is _DONE or time.perf_counter() - saved_at >= self.checkpoint_interval:
+                            checkpoint.save(snapshot)
+                            saved_at = time.perf_counter()
+
+                    if self.progress is not None and time.perf_counter() - reported_at >= self.progress_interval:
+                        reported_at = time.perf_counter()
+                        self.progress(self._stats(state['rows'], psts, state['rows'] - resumed, start))
+            finally:
+                stop.set()
+
+                # The last snapshot only covers pages that were written in full, even if writing the next failed.
+                if snapshot is not None:
+                    checkpoint.save(snapshot)
+
+        for future in futures:
+            future.result()
+
+        if self.progress is not None:
+            self.progress(self._stats(state['rows'], psts, state['rows'] - resumed, start))
+
+    @staticmethod
+    def _stats(rows: int, psts: int, written: int, start: float) -> ExportStats:
+        seconds = time.perf_counter() - start
+        return ExportStats(rows, psts, seconds, written / seconds if seconds else 0.0)
+
+
+class PhishingExporter(_Exporter):
+
+    """Exports the recipient results of one or every phishing campaign to a CSV, JSONL or Parquet file.
+
+    Recipients of up to ``workers`` phishing security tests are fetched concurrently and written page by page as
+    flat rows (the nested user and template are flattened like ResultTable does, and the campaign_id is added), so
+    memory use stays bounded by a few pages regardless of campaign size. No dataclasses are hydrated. Files have the
+    RECIPIENT_COLUMNS, followed by any other non-null key the API returns.
+
+    CSV and JSONL exports record the last page written of every test in ``<path>.checkpoint`` as they go. If an
+    export dies, running it again with resume=True truncates the file back to the checkpoint and continues from the
+    next page of each test instead of starting over. The checkpoint is removed once the export completes.
+
+    :parameter workers: an int, the number of phishing security tests fetched concurrently [Default = 4]
+    :parameter page_workers: an int, If set, up to this many pages of each test are fetched concurrently
+    [Default = None]
+    :parameter progress: a callable, called with an ExportStats of the rows written so far while exporting
+    [Default = None]
+    :parameter progress_interval: a float, the minimum number of seconds between progress calls [Default = 1]
+    :parameter checkpoint_interval: a float, the minimum number of seconds between checkpoint writes [Default = 1]
+    :parameter config: a ClientConfig, the account to export from [Default = the process-wide client config]
+    """
+
+    def __init__(self, workers: int = 4, page_workers: int = None, progress=None, progress_interval: float = 1,
+                 checkpoint_interval: float = 1, config: ClientConfig = None):
+        super().__init__(workers=workers, page_workers=page_workers, progress=progress,
+                         progress_interval=progress_interval, checkpoint_interval=checkpoint_interval)
+        self._phishing = Phishing(config)
+
+    def _security_tests(self, campaign_id: int = None) -> list:
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns~1{campaign_id}~1security_tests/get
+        if campaign_id:
+            return self._phishing._request(method="GET", url=f'campaigns/{campaign_id}/security_tests')
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
+        else:
+            return self._phishing._request(method="GET", url='security_tests')
+
+    def export(self, path: str, campaign_id: int = None, format: str = None, resume: bool = False) -> ExportStats:
+
+        """Writes every recipient of the campaign's phishing security tests to ``path``.
+
+        :parameter path: a str, the file to write
+        :parameter campaign_id: an int, a phishing campaign ID to export [Default = every campaign]
+        :parameter format: a str, the output format (csv / jsonl / parquet) [Default = inferred from the file suffix]
+        :parameter resume: a bool, If True, an interrupted export of the same tests to ``path`` continues from its
+        checkpoint (csv / jsonl only) [Default = False]
+        :return: an ExportStats, the number of rows and tests exported, the elapsed seconds and the rows per second
+        :rtype: ExportStats
+        """
+
+        psts = self._security_tests(campaign_id)
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+        streams = [(self._phishing, f'security_tests/{pst["pst_id"]}/recipients', None,
+                    {'campaign_id': pst.get('campaign_id')}) for pst in psts]
+
+        return self._export(path, format, resume, streams, len(psts), RECIPIENT_COLUMNS)
+
+
+class EnrollmentExporter(_Exporter):
+
+    """Exports training enrollments to a CSV, JSONL or Parquet file page by page, without hydrating any dataclasses
+    (the nested user is flattened into user_id / user_email / ... columns). Files have the ENROLLMENT_COLUMNS,
+    followed by any other non-null key the API returns. Checkpoints and resume work the same way as for
+    PhishingExporter.
+
+    :parameter page_workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+    :parameter progress: a callable, called with an ExportStats of the rows written so far while exporting
+    [Default = None]
+    :parameter progress_interval: a float, the minimum number of seconds between progress calls [Default = 1]
+    :parameter checkpoint_interval: a float, the minimum number of seconds between checkpoint writes [Default = 1]
+    :parameter config: a ClientConfig, the account to export from [Default = the process-wide client config]
+    """
+
+    def __init__(self, page_workers: int = None, progress=None, progress_interval: float = 1,
+                 checkpoint_interval: float = 1, config: ClientConfig = None):
+        super().__init__(workers=1, page_workers=page_workers, progress=progress,
+                         progress_interval=progress_interval, checkpoint_interval=checkpoint_interval)
+        self._training = Training(config)
+
+    def export(self, path: str, store_purchase_id: int = None, campaign_id: int = None, user_id: int = None,
+               format: str = None, resume: bool = False) -> ExportStats:
+
+        """Writes every matching training enrollment to ``path``.
+
+        :parameter path: a str, the file to write
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter user_id: an int, a user ID to filter on
+        :parameter format: a str, the output format (csv / jsonl / parquet) [Default = inferred from the file suffix]
+        :parameter resume: a bool, If True, an interrupted export with the same filters to ``path`` continues from
+        its checkpoint (csv / jsonl only) [Default = False]
+        :return: an ExportStats, the number of rows exported, the elapsed seconds and the rows per second
+        :rtype: ExportStats
+        """
+
+        params = self._training._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                                   user_id=user_id)
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        return self._export(path, format, resume, [(self._training, 'enrollments', params, {})], 0, ENROLLMENT_COLUMNS)
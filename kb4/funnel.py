@@ -0,0 +1,244 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .columnar import ResultTable, _get, _require, _sort_keys, _utc
+from .config import ClientConfig
+from .phishing import Phishing
+
+# Recipient timestamp fields, in funnel order.
+STAGES = ('scheduled_at', 'delivered_at', 'opened_at', 'clicked_at', 'replied_at', 'attachment_opened_at',
+          'macro_enabled_at', 'data_entered_at', 'vulnerable_plugins_at', 'exploited_at', 'reported_at', 'bounced_at')
+
+# Recipient fields recipients can be grouped by, and where each lives in the raw record.
+KEYS = {'pst_id': ('pst_id',), 'user_id': ('user', 'id'), 'template_id': ('template', 'id'),
+        'template_name': ('template', 'name')}
+
+
+class PhishingFunnel:
+
+    """Phishing security test results held as NumPy columns, for funnel and latency analysis in bulk.
+
+    Only the recipient keys (pst_id, user_id, template_id, template_name) and timestamps are kept, straight from the
+    raw API pages; each distinct timestamp is parsed once, converted to UTC, and stored in a datetime64[ms] array
+    (NaT where the event did not happen), and no per-recipient objects are created. Requires the optional ``numpy``
+    dependency.
+
+    :parameter columns: a dict, key columns as object arrays and STAGES columns as datetime64 arrays
+    """
+
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    @classmethod
+    def from_pages(cls, pages) -> 'PhishingFunnel':
+
+        """Builds a funnel from pages of raw recipient records, e.g. from ``Phishing._iter_pages``."""
+
+        np = _require('numpy')
+        keys = {name: [] for name in KEYS}
+
+        # Most timestamp fields are empty for most recipients, and the rest repeat (a PST is delivered in a few
+        # batches), so only the rows that have a value are recorded and each distinct string is parsed once.
+        rows = {name: [] for name in STAGES}
+        positions = {name: [] for name in STAGES}
+        strings = {name: {} for name in STAGES}
+        count = 0
+
+        for records in pages:
+            for name, path in KEYS.items():
+                keys[name].extend([_get(record, path) for record in records])
+
+            for name in STAGES:
+                stage_rows, stage_positions, index = rows[name], positions[name], strings[name]
+                for row, record in enumerate(records, count):
+                    value = record.get(name)
+                    if value:
+                        stage_rows.append(row)
+                        stage_positions.append(index.setdefault(value, len(index)))
+
+            count += len(records)
+
+        columns = {name: np.array(values, dtype=object) for name, values in keys.items()}
+
+        for name in STAGES:
+            column = np.full(count, np.datetime64('NaT'), dtype='datetime64[ms]')
+            parsed = np.array([_utc(value) for value in strings[name]], dtype='datetime64[ms]')
+            column[np.asarray(rows[name], dtype=np.intp)] = parsed[np.asarray(positions[name], dtype=np.intp)]
+            columns[name] = column
+
+        return cls(columns)
+
+    @classmethod
+    def load(cls, phishing_security_test_ids: list = None, config: ClientConfig = None, workers: int = 4,
+             page_workers: int = None) -> 'PhishingFunnel':
+
+        """Fetches the recipients of many phishing security tests concurrently and builds a funnel from them. Each
+        test's pages are added to the columns as soon as it finishes and are dropped right after, so rows come in
+        completion order and only the tests in flight are held as raw JSON.
+
+        :parameter phishing_security_test_ids: a list, the PSTs to load [Default = every PST in the account]
+        :parameter config: a ClientConfig, the account to load from [Default = the process-wide client config]
+        :parameter workers: an int, the number of PSTs fetched concurrently [Default = 4]
+        :parameter page_workers: an int, If set, up to this many pages of each PST are fetched concurrently
+        [Default = None]
+        :return: a PhishingFunnel
+        :rtype: PhishingFunnel
+        """
+
+        phishing = Phishing(config)
+        pst_ids = phishing_security_test_ids
+
+        if pst_ids is None:
+            # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
+            pst_ids = [pst['pst_id'] for pst in phishing._request(method="GET", url='security_tests')]
+
+        def fetch(pst_id: int) -> list:
+            # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+            return list(phishing._iter_pages(method="GET", url=f'security_tests/{pst_id}/recipients',
+                                             workers=page_workers))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, pst_id) for pst_id in pst_ids}
+
+            def completed():
+                # as_completed lets go of each future it yields, so discarding it here frees its pages once read.
+                for future in as_completed(futures):
+                    futures.discard(future)
+                    yield from future.result()
+
+            return cls.from_pages(completed())
+
+    def __len__(self) -> int:
+        return len(self.columns['pst_id'])
+
+    def __repr__(self):
+        return f'PhishingFunnel(recipients={len(self)}, psts={len(set(self.columns["pst_id"]))})'
+
+    def _groups(self, by) -> tuple:
+
+        """Returns (keys, rows, inverse): the distinct keys, and for each (recipient, key) pair the recipient's row
+        and the key's index. ``by`` is a key column name, a dict mapping user IDs to a list of keys (e.g. their group
+        IDs, so a recipient counts towards each of their groups), or None for a single overall group."""
+
+        np = _require('numpy')
+        count = len(self)
+
+        if by is None:
+            return np.array(['all'], dtype=object), np.arange(count), np.zeros(count, dtype=np.intp)
+
+        if isinstance(by, dict):
+            pairs = [(row, key) for row, user_id in enumerate(self.columns['user_id']) for key in by.get(user_id) or ()]
+        elif by in KEYS:
+            pairs = [(row, key) for row, key in enumerate(self.columns[by]) if key is not None]
+        else:
+            raise ValueError(f'{by} is an invalid value for by. Possible values: {list(KEYS)} or a dict')
+
+        index = {}
+        rows = np.array([row for row, _ in pairs], dtype=np.intp)
+        inverse = np.array([index.setdefault(key, len(index)) for _, key in pairs], dtype=np.intp)
+        keys = np.empty(len(index), dtype=object)
+        keys[:] = list(index)
+
+        keys, inverse = _sort_keys(keys, inverse)
+        return keys, rows, inverse
+
+    def funnel(self, by='pst_id', stages: tuple = STAGES) -> ResultTable:
+
+        """Counts the recipients reaching each stage, per key, along with each stage's rate (relative to the
+        delivered count) and the report-before-click rate: the share of delivered recipients who reported the
+        email without having clicked it first.
+
+        :parameter by: a str, a key column, a dict mapping user IDs to lists of keys, or None [Default = pst_id]
+        :parameter stages: a tuple, the timestamp fields counted [Default = STAGES]
+        :return: a ResultTable, one row per key with a <stage> count and <stage>_rate column per stage
+        :rtype: ResultTable
+        """
+
+        np = _require('numpy')
+        keys, rows, inverse = self._groups(by)
+        size = len(keys)
+        columns = {'key': keys.tolist()}
+
+        delivered = np.bincount(inverse, weights=~np.isnat(self.columns['delivered_at'][rows]), minlength=size)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for stage in stages:
+                reached = np.bincount(inverse, weights=~np.isnat(self.columns[stage][rows]), minlength=size)
+                columns[stage] = reached.astype(int).tolist()
+                columns[f'{stage}_rate'] = (reached / delivered).tolist()
+
+            columns['report_before_click_rate'] = (np.bincount(inverse, weights=self._reported_first()[rows],
+                                                               minlength=size) / delivered).tolist()
+
+        return ResultTable(columns)
+
+    def _reported_first(self):
+        np = _require('numpy')
+        reported, clicked = self.columns['reported_at'], self.columns['clicked_at']
+        return ~np.isnat(reported) & (np.isnat(clicked) | (reported < clicked))
+
+    def latencies(self, start: str = 'delivered_at', end: str = 'clicked_at'):
+
+        """Returns, per recipient, the seconds from ``start`` to ``end`` (NaN where either did not happen).
+
+        :parameter start: a str, the earlier timestamp field [Default = delivered_at]
+        :parameter end: a str, the later timestamp field [Default = clicked_at]
+        :return: a numpy.ndarray of float seconds
+        """
+
+        np = _require('numpy')
+
+        for name in (start, end):
+            if name not in STAGES:
+                raise ValueError(f'{name} is an invalid stage. Possible values: {list(STAGES)}')
+
+        delta = (self.columns[end] - self.columns[start]).astype('timedelta64[ms]')
+        return np.where(np.isnat(delta), np.nan, delta.astype(float) / 1000)
+
+    def latency_stats(self, start: str = 'delivered_at', end: str = 'clicked_at', by='pst_id',
+                      q: tuple = (50, 90, 99)) -> ResultTable:
+
+        """Summarizes the ``start`` to ``end`` latency distribution per key, e.g. time-to-click or time-to-report
+        (delivered_at to reported_at), with a single sort across all keys.
+
+        :parameter start: a str, the earlier timestamp field [Default = delivered_at]
+        :parameter end: a str, the later timestamp field [Default = clicked_at]
+        :parameter by: a str, a key column, a dict mapping user IDs to lists of keys, or None [Default = pst_id]
+        :parameter q: a tuple, the percentiles reported [Default = (50, 90, 99)]
+        :return: a ResultTable, one row per key with count, mean, min, max and p<q> columns (in seconds)
+        :rtype: ResultTable
+        """
+
+        np = _require('numpy')
+        keys, rows, inverse = self._groups(by)
+        seconds = self.latencies(start, end)[rows]
+
+        measured = ~np.isnan(seconds)
+        seconds, inverse = seconds[measured], inverse[measured]
+        order = np.lexsort((seconds, inverse))
+        inverse = inverse[order]
+
+        # A trailing NaN keeps the rank lookups of keys without any measurement in bounds; they are masked anyway.
+        seconds = np.append(seconds[order], np.nan)
+
+        counts = np.bincount(inverse, minlength=len(keys))
+        starts = np.cumsum(counts) - counts
+        last = np.maximum(starts + counts - 1, 0)
+        empty = counts == 0
+
+        columns = {'key': keys.tolist(), 'count': counts.tolist()}
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            totals = np.bincount(inverse, weights=seconds[:-1], minlength=len(keys))
+            columns['mean'] = np.where(empty, np.nan, totals / counts).tolist()
+
+        columns['min'] = np.where(empty, np.nan, seconds[starts]).tolist()
+        columns['max'] = np.where(empty, np.nan, seconds[last]).tolist()
+
+        for percentile in q:
+            # Linear interpolation between the two closest ranks, like numpy.percentile's default.
+            position = starts + np.maximum(counts - 1, 0) * percentile / 100
+            lower = np.floor(position).astype(np.intp)
+            upper = np.minimum(lower + 1, last)
+            value = seconds[lower] + (seconds[upper] - seconds[lower]) * (position - lower)
+            columns[f'p{percentile}'] = np.where(empty, np.nan, value).tolist()
+
+        return ResultTable(columns)
@@ -1,10 +1,11 @@
 from .api import API, Group
+from .config import ClientConfig
 
 
 class Groups(API):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: ClientConfig = None):
+        super().__init__(config)
         self._domain = f'{self._domain}/groups'
 
     def get(self, status: str = 'active', group_id: int = None, ) -> list:
@@ -17,8 +18,6 @@ class Groups(API):
         :rtype: list
         """
 
-        params = {}
-
         # Get a Specific Group
         # https://developer.knowbe4.com/reporting/#tag/Groups/paths/~1v1~1groups~1{group_id}/get
         if group_id:
@@ -28,16 +27,21 @@ class Groups(API):
         # Get All Groups:
         # https://developer.knowbe4.com/reporting/#tag/Groups/paths/~1v1~1groups/get
         else:
-            if group_id:
-                params.update({'group_id': group_id})
-            if status.lower() not in ['archived', 'active']:
-                raise ValueError(f'{status} is an invalid value for status. Possible values: '
-                                 f'["active", "archived"]')
-            else:
-                if status.lower() == 'archived':
-                    params.update({'status': 'archived'})
-                elif status.lower() == 'active':
-                    params.update({'status': 'active'})
-
             return [Group.from_dict(group)
-                    for group in self._request(method="GET", url="", params=params)]
+                    for group in self._request(method="GET", url="", params=self._group_params(status=status))]
+
+    @staticmethod
+    def _group_params(status: str = 'active') -> dict:
+
+        params = {}
+
+        if status.lower() not in ['archived', 'active']:
+            raise ValueError(f'{status} is an invalid value for status. Possible values: '
+                             f'["active", "archived"]')
+        else:
+            if status.lower() == 'archived':
+                params.update({'status': 'archived'})
+            elif status.lower() == 'active':
+                params.update({'status': 'active'})
+
+        return params
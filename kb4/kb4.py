@@ -1,18 +1,68 @@
+import importlib
 import os
-from .training import Training
-from .account import Account
-from .users import Users
-from .groups import Groups
-from .phishing import Phishing
+import threading
+
+
+class _SubClient:
+
+    """Imports and builds a sub-client on first access. Unless a KB4 instance has its own ClientConfig, the
+    sub-client is shared by the KB4 class and all of its instances and uses the process-wide client config; it is
+    rebuilt on the next access after ``configure_client`` or ``set_config`` replaces that config. Otherwise each
+    instance builds its own from its config."""
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._client = None
+        self._client_config = None
+        self._lock = threading.Lock()
+
+    def _build(self, config=None):
+        module = importlib.import_module(f'.{self._module}', __package__)
+        return getattr(module, self._name)(config)
+
+    def __get__(self, obj, owner=None):
+
+        if obj is not None and obj._config is not None:
+            clients = obj._clients
+            if self._name not in clients:
+                with self._lock:
+                    if self._name not in clients:
+                        clients[self._name] = self._build(obj._config)
+            return clients[self._name]
+
+        from .config import get_config
+
+        config = get_config()
+
+        if self._client_config is not config:
+            with self._lock:
+                if self._client_config is not config:
+                    self._client = self._build(config)
+                    self._client_config = config
+
+        return self._client
 
 
 class KB4:
 
-    training = Training()
-    account = Account()
-    users = Users()
-    groups = Groups()
-    phishing = Phishing()
+    """The KnowBe4 reporting API client, exposing the training / account / users / groups / phishing sub-clients.
+
+    :parameter config: a ClientConfig, the account, region, transport and caches of this client's sub-clients
+    [Default = the process-wide client config]
+    """
+
+    training = _SubClient('training', 'Training')
+    account = _SubClient('account', 'Account')
+    users = _SubClient('users', 'Users')
+    groups = _SubClient('groups', 'Groups')
+    phishing = _SubClient('phishing', 'Phishing')
+
+    _config = None
+
+    def __init__(self, config=None):
+        self._config = config
+        self._clients = {}
 
     @staticmethod
     def reset_auth_token():
@@ -0,0 +1,199 @@
+import re
+import threading
+from urllib.parse import urlsplit
+
+# Upper bounds (in seconds) of the latency buckets kept by InMemoryMetrics.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float('inf'))
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint(url: str) -> str:
+
+    """Returns the API path of ``url`` with numeric IDs replaced by {id}, e.g. /v1/phishing/security_tests/{id}/
+    recipients, so every entity of an endpoint shares the same metric labels."""
+
+    return _ID_SEGMENT.sub('/{id}', urlsplit(url).path.rstrip('/'))
+
+
+class MetricsSink:
+
+    """The interface every metrics backend implements. The base class discards everything, so it doubles as a
+    disabled sink.
+
+    Metrics recorded by the library:
+
+    - kb4_request_seconds (histogram; endpoint, method, status): latency of each HTTP attempt
+    - kb4_response_bytes (histogram; endpoint): size of each response body
+    - kb4_pages (counter; endpoint): pages fetched
+    - kb4_retries (counter; endpoint, reason): retried attempts
+    - kb4_response_cache (counter; endpoint, result): persistent response cache hits, revalidations and misses
+    - kb4_entity_cache (counter; cache, result): group / user / PST cache hits and misses
+    - kb4_hydration_seconds (histogram; entity): time spent turning a page of records into objects
+    """
+
+    def observe(self, name: str, value: float, **labels):
+        pass
+
+    def increment(self, name: str, value: float = 1, **labels):
+        pass
+
+
+class InMemoryMetrics(MetricsSink):
+
+    """A thread-safe collector keeping every metric in memory, keyed by name and labels.
+
+    Histograms keep their count, sum, min, max and per-bucket counts; counters keep their total.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self._buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+
+            if histogram is None:
+                histogram = self._histograms[key] = {'count': 0, 'sum': 0.0, 'min': value, 'max': value,
+                                                     'buckets': [0] * len(self._buckets)}
+
+            histogram['count'] += 1
+            histogram['sum'] += value
+            histogram['min'] = min(histogram['min'], value)
+            histogram['max'] = max(histogram['max'], value)
+            histogram['buckets'][next(i for i, bound in enumerate(self._buckets) if value <= bound)] += 1
+
+    def increment(self, name: str, value: float = 1, **labels):
+
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def histograms(self, name: str = None) -> list:
+
+        """Returns (name, labels, stats) tuples for every histogram, or only those called ``name``."""
+
+        with self._lock:
+            return [(key[0], dict(key[1]), {**stats, 'buckets': list(stats['buckets'])})
+                    for key, stats in self._histograms.items() if name is None or key[0] == name]
+
+    def counters(self, name: str = None) -> list:
+
+        """Returns (name, labels, total) tuples for every counter, or only those called ``name``."""
+
+        with self._lock:
+            return [(key[0], dict(key[1]), total) for key, total in self._counters.items()
+                    if name is None or key[0] == name]
+
+    def top(self, name: str = 'kb4_request_seconds', n: int = 10) -> list:
+
+        """Returns the ``n`` label sets of a histogram with the highest total, e.g. the endpoints that dominate the
+        request time of a job.
+
+        :parameter name: a str, the histogram to rank [Default = kb4_request_seconds]
+        :parameter n: an int, the number of entries returned [Default = 10]
+        :return: a list, (labels, stats) tuples sorted by descending sum
+        :rtype: list
+        """
+
+        return [(labels, stats) for _, labels, stats in sorted(self.histograms(name), key=lambda h: -h[2]['sum'])][:n]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+class PrometheusMetrics(MetricsSink):
+
+    """Forwards metrics to prometheus_client, creating each Histogram / Counter on first use.
+
+    :parameter registry: a prometheus_client.CollectorRegistry [Default = the global registry]
+    """
+
+    def __init__(self, registry=None):
+
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError('PrometheusMetrics requires prometheus_client. Install it with '
+                              '"pip install prometheus-client".')
+
+        self._client = prometheus_client
+        self._registry = registry or prometheus_client.REGISTRY
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _metric(self, kind, name: str, labels: dict):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = kind(name, name.replace('_', ' '), sorted(labels),
+                                                    registry=self._registry)
+        return metric.labels(**labels) if labels else metric
+
+    def observe(self, name: str, value: float, **labels):
+        self._metric(self._client.Histogram, name, labels).observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        self._metric(self._client.Counter, name, labels).inc(value)
+
+
+class OpenTelemetryMetrics(MetricsSink):
+
+    """Forwards metrics to the OpenTelemetry metrics API, creating each histogram / counter on first use.
+
+    :parameter meter: an opentelemetry.metrics.Meter [Default = a meter named kb4 from the global provider]
+    """
+
+    def __init__(self, meter=None):
+
+        try:
+            from opentelemetry import metrics
+        except ImportError:
+            raise ImportError('OpenTelemetryMetrics requires opentelemetry-api. Install it with '
+                              '"pip install opentelemetry-api".')
+
+        self._meter = meter or metrics.get_meter('kb4')
+        self._instruments = {}
+        self._lock = threading.Lock()
+
+    def _instrument(self, factory, name: str):
+        with self._lock:
+            instrument = self._instruments.get(name)
+            if instrument is None:
+                instrument = self._instruments[name] = factory(name)
+        return instrument
+
+    def observe(self, name: str, value: float, **labels):
+        self._instrument(self._meter.create_histogram, name).record(value, attributes=labels)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        self._instrument(self._meter.create_counter, name).add(value, attributes=labels)
+
+
+_DEFAULT_METRICS = InMemoryMetrics()
+_METRICS = _DEFAULT_METRICS
+
+
+def get_metrics() -> MetricsSink:
+    return _METRICS
+
+
+def set_metrics(sink: MetricsSink = None):
+
+    """Replaces the process-wide metrics sink.
+
+    :parameter sink: a MetricsSink, e.g. PrometheusMetrics() or MetricsSink() to disable collection
+    [Default = the built-in InMemoryMetrics collector]
+    """
+
+    global _METRICS
+    _METRICS = sink if sink is not None else _DEFAULT_METRICS
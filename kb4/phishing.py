@@ -1,18 +1,24 @@
 from .api import API, PhishingCampaign, PhishingSecurityTest, PhishingCampaignRecipient
+from .config import ClientConfig
+from .columnar import ResultTable
+from .query import Query
+from .records import RecipientRecord
 
 
 class Phishing(API):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: ClientConfig = None):
+        super().__init__(config)
         self._domain = f'{self._domain}/phishing'
 
-    def get_campaigns(self, campaign_id: int = None) -> list:
+    def get_campaigns(self, campaign_id: int = None, eager: bool = False) -> list:
 
         """Retrieves all phishing campaigns (or a specific phishing campaign if a campaign_id is
         provided) in your KnowBe4 account.
 
         :parameter campaign_id: an int, a phishing campaign ID to filter on
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
@@ -20,22 +26,25 @@ class Phishing(API):
         # Get a Specific Phishing Campaign:
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns~1{campaign_id}/get
         if campaign_id:
-            return [PhishingCampaign.from_dict(phishing_campaign)
-                    for phishing_campaign in self._request(method="GET", url=f'campaigns/{campaign_id}')]
+            return PhishingCampaign.from_dicts(self._request(method="GET", url=f'campaigns/{campaign_id}'),
+                                               eager=eager, config=self._config)
 
         # Get All Phishing Campaigns:
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns/get
         else:
-            return [PhishingCampaign.from_dict(phishing_campaign)
-                    for phishing_campaign in self._request(method="GET", url=f'campaigns')]
+            return PhishingCampaign.from_dicts(self._request(method="GET", url=f'campaigns'), eager=eager,
+                                               config=self._config)
 
-    def get_security_tests(self, campaign_id: int = None, phishing_security_test_id: int = None) -> list:
+    def get_security_tests(self, campaign_id: int = None, phishing_security_test_id: int = None,
+                           eager: bool = False) -> list:
 
         """Retrieves all phishing security tests (or a phishing security test from a specific campaign if a
         campaign_id is provided) in your KnowBe4 account.
 
         :parameter campaign_id: an int, a security test campaign ID to filter on
         :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
@@ -46,28 +55,34 @@ class Phishing(API):
         # Get a Phishing Security Test From a Specific Campaign:
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns~1{campaign_id}~1security_tests/get
         if campaign_id:
-            return [PhishingSecurityTest.from_dict(pst)
-                    for pst in self._request(method="GET", url=f'campaigns/{campaign_id}/security_tests')]
+            return PhishingSecurityTest.from_dicts(
+                self._request(method="GET", url=f'campaigns/{campaign_id}/security_tests'), eager=eager,
+                config=self._config)
 
         # Get a Specific PST
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}/get
         elif phishing_security_test_id:
-            return [PhishingSecurityTest.from_dict(pst)
-                    for pst in self._request(method="GET", url=f'security_tests/{phishing_security_test_id}')]
+            return PhishingSecurityTest.from_dicts(
+                self._request(method="GET", url=f'security_tests/{phishing_security_test_id}'), eager=eager,
+                config=self._config)
 
         # Get All Phishing Security Tests:
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
         else:
-            return [PhishingSecurityTest.from_dict(pst)
-                    for pst in self._request(method="GET", url=f'security_tests')]
+            return PhishingSecurityTest.from_dicts(self._request(method="GET", url=f'security_tests'), eager=eager,
+                                                   config=self._config)
 
-    def get_security_test_results(self, phishing_security_test_id: int = None, recipient_id: int = None) -> list:
+    def get_security_test_results(self, phishing_security_test_id: int = None, recipient_id: int = None,
+                                  workers: int = None, compact: bool = False) -> list:
 
         """Retrieves all recipients (or a specific recipient if a user_id is provided) from a phishing security test in
         your KnowBe4 account.
 
         :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
         :parameter recipient_id: an int, a recipient ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter compact: a bool, If True, compact slotted RecipientRecord objects are returned instead
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
@@ -78,11 +93,113 @@ class Phishing(API):
         # Get a Specific Recipient's Results
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients~1{recipient_id}/get
         if recipient_id:
-            return [PhishingCampaignRecipient.from_dict(pcr)
-                    for pcr in self._request(method="GET", url=f'security_tests/{phishing_security_test_id}/recipients/{recipient_id}')]
+            datacls = RecipientRecord if compact else PhishingCampaignRecipient
+            return datacls.from_dicts(self._request(
+                method="GET", url=f'security_tests/{phishing_security_test_id}/recipients/{recipient_id}'))
 
         # Get All Recipient Results
         # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
         else:
-            return [PhishingCampaignRecipient.from_dict(pcr) for pcr
-                    in self._request(method="GET", url=f'security_tests/{phishing_security_test_id}/recipients')]
+            return list(self.iter_security_test_results(phishing_security_test_id=phishing_security_test_id,
+                                                        workers=workers, compact=compact))
+
+    def iter_security_test_results(self, phishing_security_test_id: int = None, workers: int = None,
+                                   compact: bool = False):
+
+        """Yields all recipients from a phishing security test in your KnowBe4 account page by page, so only one page
+        is held in memory at a time.
+
+        :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter compact: a bool, If True, compact slotted RecipientRecord objects are returned instead
+        [Default = False]
+        :return: a generator of PhishingCampaignRecipient objects
+        :rtype: generator
+        """
+
+        if not phishing_security_test_id:
+            raise ValueError("A value must be provided for phishing_security_test_id.")
+
+        datacls = RecipientRecord if compact else PhishingCampaignRecipient
+
+        return (pcr for pcrs
+                in self._iter_pages(method="GET", url=f'security_tests/{phishing_security_test_id}/recipients',
+                                    workers=workers)
+                for pcr in datacls.from_dicts(pcrs))
+
+    def get_security_test_results_table(self, phishing_security_test_id: int = None,
+                                        workers: int = None) -> ResultTable:
+
+        """Retrieves all recipients from a phishing security test in your KnowBe4 account as a column-oriented
+        ResultTable, built directly from the API pages. The nested user and template are flattened into user_id /
+        user_email / template_name / ... columns.
+
+        :parameter phishing_security_test_id: an int, a phishing security test ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a ResultTable, convertible with to_pandas / to_arrow / to_parquet
+        :rtype: ResultTable
+        """
+
+        if not phishing_security_test_id:
+            raise ValueError("A value must be provided for phishing_security_test_id.")
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+        return self._table(url=f'security_tests/{phishing_security_test_id}/recipients', workers=workers)
+
+    def query_campaigns(self) -> Query:
+
+        """Starts a query over the phishing campaigns in your KnowBe4 account. Every filter is applied to the raw
+        campaigns before they are hydrated, so the groups and PSTs of campaigns that do not match are never resolved.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns/get
+        return Query(self, route=lambda: ('campaigns', None), datacls=PhishingCampaign)
+
+    def query_security_tests(self) -> Query:
+
+        """Starts a query over the phishing security tests in your KnowBe4 account. A campaign_id filter is sent to
+        the API; every other filter is applied to the raw tests before they are hydrated.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        return Query(self, route=self._security_tests_route, datacls=PhishingSecurityTest, pushdown=['campaign_id'])
+
+    @staticmethod
+    def _security_tests_route(campaign_id: int = None) -> tuple:
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1campaigns~1{campaign_id}~1security_tests/get
+        if campaign_id:
+            return f'campaigns/{campaign_id}/security_tests', None
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
+        else:
+            return 'security_tests', None
+
+    def query_security_test_results(self) -> Query:
+
+        """Starts a query over the recipients of phishing security tests, e.g.
+        ``phishing.query_security_test_results().where(pst_id__in=[1, 2], clicked_at__isnull=False).all()``.
+
+        A pst_id filter is required and is sent to the API (one request per test); every other filter is applied to
+        each page before it is hydrated.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        return Query(self, route=self._security_test_results_route, datacls=PhishingCampaignRecipient,
+                     record_cls=RecipientRecord, pushdown=['pst_id'])
+
+    @staticmethod
+    def _security_test_results_route(pst_id: int = None) -> tuple:
+
+        if not pst_id:
+            raise ValueError("A value must be provided for pst_id.")
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+        return f'security_tests/{pst_id}/recipients', None
@@ -0,0 +1,91 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from .cache import CacheRegistry
+from .config import ClientConfig
+from .kb4 import KB4
+from .scheduler import TokenBucket
+from .transport import Transport
+
+# value is what the job returned and error the exception it raised (one of them is None); seconds is the job's run
+# time, or the time waited for it if it timed out.
+TenantResult = namedtuple('TenantResult', ['tenant', 'value', 'error', 'seconds'])
+
+
+class TenantPool:
+
+    """Runs the same job against many KnowBe4 accounts concurrently.
+
+    Every tenant gets its own KB4 client. Tenants whose ClientConfig has no transport or caches of its own get a
+    dedicated Transport (connection pool, retries and, if ``rate`` is set, a request budget of ``rate`` requests per
+    second) and their own entity caches, so a slow or throttled tenant only delays its own job, and cached groups /
+    users / PSTs never leak between accounts.
+
+    :parameter tenants: a dict, tenant names mapped to the ClientConfig of each account
+    :parameter workers: an int, the number of tenants processed at once [Default = 8]
+    :parameter rate: a float, the per-tenant request budget in requests per second [Default = no limit]
+    :parameter pool_size: an int, the number of pooled connections per tenant [Default = 10]
+    """
+
+    def __init__(self, tenants: dict, workers: int = 8, rate: float = None, pool_size: int = 10):
+        self.workers = workers
+        self.clients = {name: KB4(self._isolate(config, rate, pool_size)) for name, config in tenants.items()}
+
+    @staticmethod
+    def _isolate(config: ClientConfig, rate: float, pool_size: int) -> ClientConfig:
+        return ClientConfig(api_key=config.api_key, region=config.region, base_url=config.base_url,
+                            transport=config._transport or Transport(
+                                pool_size=pool_size, rate_limiter=TokenBucket(rate) if rate else None),
+                            caches=config._caches or CacheRegistry.default())
+
+    def _run(self, job, name: str) -> TenantResult:
+
+        started = time.perf_counter()
+
+        try:
+            return TenantResult(name, job(self.clients[name]), None, time.perf_counter() - started)
+        except Exception as error:
+            return TenantResult(name, None, error, time.perf_counter() - started)
+
+    def as_completed(self, job):
+
+        """Runs ``job`` for every tenant and yields each TenantResult as soon as its tenant finishes.
+
+        :parameter job: a callable, called with the tenant's KB4 client, e.g. ``lambda kb4: kb4.users.get()``
+        :return: a generator of TenantResult objects, in completion order
+        """
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in as_completed([executor.submit(self._run, job, name) for name in self.clients]):
+                yield future.result()
+
+    def run(self, job, timeout: float = None) -> dict:
+
+        """Runs ``job`` for every tenant and waits for all of them. A job's exception is captured in its tenant's
+        result instead of being raised, so one failing tenant does not lose the others' results.
+
+        :parameter job: a callable, called with the tenant's KB4 client
+        :parameter timeout: a float, the maximum number of seconds to wait. Tenants still running then get a
+        TimeoutError result (their jobs finish in the background) [Default = no limit]
+        :return: a dict, tenant names mapped to TenantResult objects
+        :rtype: dict
+        """
+
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        futures = {}
+
+        try:
+            for name in self.clients:
+                futures[name] = executor.submit(self._run, job, name)
+            wait(futures.values(), timeout=timeout)
+        finally:
+            # shutdown(cancel_futures=True) needs Python 3.9, so jobs that have not started are cancelled here.
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        return {name: future.result() if future.done() and not future.cancelled() else
+                TenantResult(name, None, TimeoutError(f'{name} did not finish within {timeout} seconds'),
+                             time.perf_counter() - started)
+                for name, future in futures.items()}
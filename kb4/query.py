@@ -0,0 +1,295 @@
+import copy
+import operator
+from collections import namedtuple
+from dataclasses import fields
+from itertools import product
+from .columnar import ResultTable, _get
+
+
+def _ordered(compare):
+    return lambda value, other: value is not None and compare(value, other)
+
+
+def _in(value, values) -> bool:
+    return value in values
+
+
+def _contains(value, part) -> bool:
+    return value is not None and part in value
+
+
+def _isnull(value, isnull: bool) -> bool:
+    return (value is None) == bool(isnull)
+
+
+# Lookups accepted as ``<field>__<operator>`` by Query.where; a bare field name means eq.
+_OPERATORS = {'eq': operator.eq, 'ne': operator.ne, 'lt': _ordered(operator.lt), 'lte': _ordered(operator.le),
+              'gt': _ordered(operator.gt), 'gte': _ordered(operator.ge), 'in': _in, 'contains': _contains,
+              'isnull': _isnull}
+
+
+def _lookup(name: str) -> tuple:
+
+    """Splits a lookup like ``user__email__in`` into its field path, ('user', 'email'), and operator, 'in'."""
+
+    parts = name.split('__')
+    op = parts.pop() if len(parts) > 1 and parts[-1] in _OPERATORS else 'eq'
+    return tuple(parts), op
+
+
+def _predicate(path: tuple, op: str, value):
+
+    if op == 'in':
+        try:
+            value = frozenset(value)
+        except TypeError:
+            value = list(value)
+
+    compare = _OPERATORS[op]
+
+    return lambda record: compare(_get(record, path), value)
+
+
+class Query:
+
+    """A chainable query over one list endpoint, evaluated when it is iterated.
+
+    Filters the API supports (e.g. a user's status or an enrollment's campaign_id) are sent as request parameters; an
+    ``__in`` filter on one of them issues one request per value. Every other filter is checked against the raw JSON
+    records of each page as it arrives, so records that do not match are never hydrated, and their related objects
+    are never resolved. ``select`` skips hydration altogether and yields lightweight named tuples of only the
+    requested fields.
+
+    Queries are built by the sub-clients, e.g. ``Users.query()`` or ``Training.query_enrollments()``, and each
+    method returns a new Query, leaving the original unchanged.
+
+    :parameter client: an API, the sub-client the requests are sent with
+    :parameter route: a callable, maps the pushed down filters (as keyword arguments) to a (url, params) tuple
+    :parameter datacls: a class, the dataclass records are hydrated into
+    :parameter record_cls: a class, the compact Record type used when compact=True [Default = None]
+    :parameter pushdown: a list, the filters ``route`` accepts [Default = none]
+    :parameter transform: a callable, applied to each raw record before it is filtered, e.g. to normalize
+    statuses [Default = None]
+    :parameter domains: a dict, every value of pushdown filters whose route default leaves records out (e.g. a
+    users status, active unless given), requested when such a filter uses an operator other than eq / in
+    [Default = None]
+    :parameter aliases: a dict, dataclass fields that are derived on hydration mapped to their path in the raw
+    record, e.g. {'email': ('user', 'email')} [Default = None]
+    """
+
+    def __init__(self, client, route, datacls, record_cls=None, pushdown: list = (), transform=None,
+                 domains: dict = None, aliases: dict = None):
+        self._client = client
+        self._route = route
+        self._datacls = datacls
+        self._record_cls = record_cls
+        self._pushdown = frozenset(pushdown)
+        self._domains = domains or {}
+        self._aliases = aliases or {}
+
+        # Filters are checked against the raw records, which only carry the init fields.
+        self._fields = frozenset(f.name for f in fields(datacls) if f.init)
+        self._transform = transform
+        self._pushed = {}
+        self._predicates = []
+        self._projection = None
+        self._limit = None
+
+    def _copy(self) -> 'Query':
+        query = copy.copy(self)
+        query._pushed = dict(self._pushed)
+        query._predicates = list(self._predicates)
+        return query
+
+    def _path(self, path: tuple) -> tuple:
+
+        """Validates a field path and maps a derived field to where it lives in the raw record."""
+
+        if path[0] in self._aliases:
+            return (*self._aliases[path[0]], *path[1:])
+
+        if path[0] not in self._fields and path[0] not in self._pushdown:
+            raise ValueError(f'{path[0]} is an invalid field for {self._datacls.__name__} queries. Possible values: '
+                             f'{sorted(self._fields | self._pushdown | set(self._aliases))}')
+
+        return path
+
+    def where(self, **conditions) -> 'Query':
+
+        """Adds filters, all of which must match. Each keyword is a field name, optionally followed by __<field> to
+        reach into a nested object and by an operator: eq (the default), ne, lt, lte, gt, gte, in, contains or
+        isnull, e.g. ``where(location='Berlin', current_risk_score__gte=40, user__email__contains='@corp')``.
+
+        :return: a Query, a new query with the filters added
+        :rtype: Query
+        """
+
+        query = self._copy()
+
+        for name, value in conditions.items():
+            path, op = _lookup(name)
+            path = self._path(path)
+
+            if len(path) == 1 and path[0] in self._pushdown and op in ['eq', 'in']:
+                values = [value] if op == 'eq' else list(value)
+                pushed = query._pushed.get(path[0])
+                query._pushed[path[0]] = values if pushed is None else [v for v in pushed if v in values]
+
+            elif len(path) == 1 and path[0] in self._domains:
+                # The API only filters on equality, and its default would leave out records this condition may
+                # match, so every value is requested (unless already narrowed) and the condition checked locally.
+                query._pushed.setdefault(path[0], list(self._domains[path[0]]))
+                query._predicates.append(_predicate(path, op, value))
+
+            elif path[0] not in self._fields:
+                raise ValueError(f'{op} is an invalid operator for {path[0]}. Possible values: ["eq", "in"]')
+
+            else:
+                query._predicates.append(_predicate(path, op, value))
+
+        return query
+
+    def filter(self, predicate) -> 'Query':
+
+        """Adds an arbitrary filter, called with each raw JSON record (a dict) before it is hydrated.
+
+        :parameter predicate: a callable, returns True for records to keep
+        :return: a Query, a new query with the filter added
+        :rtype: Query
+        """
+
+        query = self._copy()
+        query._predicates.append(predicate)
+        return query
+
+    def select(self, *names) -> 'Query':
+
+        """Projects the results onto the given fields. Nested fields are given as ``user__email`` and come back as
+        ``user_email``, the same naming ResultTable uses.
+
+        :return: a Query, a new query yielding named tuples of only these fields
+        :rtype: Query
+        """
+
+        query = self._copy()
+        query._projection = [(name.replace('__', '_'), self._path(tuple(name.split('__')))) for name in names]
+        return query
+
+    def limit(self, n: int) -> 'Query':
+
+        """Stops after ``n`` matching records; no further pages are requested once they are found.
+
+        :return: a Query, a new query returning at most n records
+        :rtype: Query
+        """
+
+        query = self._copy()
+        query._limit = n
+        return query
+
+    def _requests(self):
+        names = list(self._pushed)
+        for values in product(*(self._pushed[name] for name in names)):
+            yield self._route(**dict(zip(names, values)))
+
+    def _pages(self, workers: int = None):
+
+        """Yields the matching raw records of each page."""
+
+        remaining = self._limit
+
+        if remaining is not None and remaining <= 0:
+            return
+
+        for url, params in self._requests():
+            for records in self._client._iter_pages(method="GET", url=url, params=params, workers=workers):
+
+                if self._transform is not None:
+                    records = [self._transform(record) for record in records]
+
+                matches = [record for record in records if all(predicate(record) for predicate in self._predicates)]
+
+                if remaining is not None:
+                    matches = matches[:remaining]
+                    remaining -= len(matches)
+
+                if matches:
+                    yield matches
+
+                if remaining == 0:
+                    return
+
+    def iter(self, workers: int = None, eager: bool = False, compact: bool = False):
+
+        """Yields the matching results page by page, so only one page is held in memory at a time.
+
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
+        :parameter compact: a bool, If True, compact slotted Record objects are returned instead [Default = False]
+        :return: a generator of dataclass objects, or of named tuples if fields were selected
+        :rtype: generator
+        """
+
+        if self._projection is not None:
+            row = namedtuple('Row', [name for name, _ in self._projection])
+            return (row._make(_get(record, path) for _, path in self._projection)
+                    for records in self._pages(workers) for record in records)
+
+        if compact and self._record_cls is None:
+            raise ValueError(f'compact is not supported for {self._datacls.__name__} queries.')
+
+        datacls = self._record_cls if compact else self._datacls
+        config = self._client._config
+
+        return (obj for records in self._pages(workers)
+                for obj in datacls.from_dicts(records, eager=eager, config=config))
+
+    def __iter__(self):
+        return self.iter()
+
+    def all(self, workers: int = None, eager: bool = False, compact: bool = False) -> list:
+
+        """Returns every matching result. Takes the same parameters as ``iter``.
+
+        :return: a list, dataclass objects, or named tuples if fields were selected
+        :rtype: list
+        """
+
+        return list(self.iter(workers=workers, eager=eager, compact=compact))
+
+    def first(self, eager: bool = False, compact: bool = False):
+
+        """Returns the first matching result, or None if nothing matches."""
+
+        return next(self.limit(1).iter(eager=eager, compact=compact), None)
+
+    def count(self, workers: int = None) -> int:
+
+        """Counts the matching records without hydrating any of them."""
+
+        return sum(len(records) for records in self._pages(workers))
+
+    def table(self, workers: int = None) -> ResultTable:
+
+        """Returns the matching records as a column-oriented ResultTable, restricted to the selected fields if any.
+
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a ResultTable, convertible with to_pandas / to_arrow / to_parquet
+        :rtype: ResultTable
+        """
+
+        if self._projection is None:
+            return ResultTable.from_pages(self._pages(workers))
+
+        columns = {name: [] for name, _ in self._projection}
+
+        for records in self._pages(workers):
+            for name, path in self._projection:
+                columns[name].extend(_get(record, path) for record in records)
+
+        return ResultTable(columns)
+
+    def __repr__(self):
+        return (f'Query({self._datacls.__name__}, pushed={self._pushed}, filters={len(self._predicates)}, '
+                f'fields={self._projection}, limit={self._limit})')
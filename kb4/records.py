@@ -0,0 +1,237 @@
+import sys
+import time
+from copy import deepcopy
+from dataclasses import dataclass, fields
+from .api import _enrollment_status, _resolve_users
+from .config import ClientConfig
+from .metrics import get_metrics
+
+
+class Record:
+
+    """Base class for the compact, slotted record types.
+
+    Each record type declares its ``__slots__`` by hand (``@dataclass(slots=True)`` would require Python 3.10), so
+    records have no per-instance ``__dict__``, and string values of the fields listed in ``_interned`` (statuses,
+    locations, divisions, ...) are interned so repeated values share one string object. Relationships are kept as
+    ids instead of object references.
+    """
+
+    __slots__ = ()
+
+    _interned = ()
+
+    @classmethod
+    def _values(cls, obj: dict) -> dict:
+        return {f.name: obj.get(f.name) for f in fields(cls) if f.init}
+
+    @classmethod
+    def from_dict(cls, obj: dict):
+
+        values = cls._values(obj)
+
+        for name in cls._interned:
+            if isinstance(values[name], str):
+                values[name] = sys.intern(values[name])
+
+        return cls(**values)
+
+    @classmethod
+    def from_dicts(cls, objs, eager: bool = False, config: ClientConfig = None) -> list:
+
+        """Hydrates a whole result set. If eager is True, related objects are resolved in bulk immediately. Records
+        with relations resolve them with ``config`` (the default client config if None)."""
+
+        started = time.perf_counter()
+        records = [cls.from_dict(obj) for obj in objs]
+        get_metrics().observe('kb4_hydration_seconds', time.perf_counter() - started, entity=cls.__name__)
+
+        if config is not None and hasattr(cls, '_config'):
+            for record in records:
+                record._config = config
+
+        if eager and records:
+            cls._resolve(records)
+
+        return records
+
+    @classmethod
+    def _resolve(cls, records: list):
+        pass
+
+    def to_dict(self):
+        return {f.name: deepcopy(getattr(self, f.name)) for f in fields(self) if f.init}
+
+
+@dataclass()
+class UserRecord(Record):
+
+    __slots__ = ('id', 'employee_number', 'first_name', 'last_name', 'job_title', 'email', 'phish_prone_percentage',
+                 'phone_number', 'extension', 'mobile_phone_number', 'location', 'division', 'manager_name',
+                 'manager_email', 'adi_manageable', 'adi_guid', 'groups', 'current_risk_score', 'risk_score_history',
+                 'aliases', 'joined_on', 'last_sign_in', 'status', 'organization', 'department', 'language', 'comment',
+                 'employee_start_date', 'archived_at', 'custom_field_1', 'custom_field_2', 'custom_field_3',
+                 'custom_field_4', 'custom_date_1', 'custom_date_2')
+
+    id: int
+    employee_number: int
+    first_name: str
+    last_name: str
+    job_title: str
+    email: str
+    phish_prone_percentage: int
+    phone_number: str
+    extension: str
+    mobile_phone_number: str
+    location: str
+    division: str
+    manager_name: str
+    manager_email: str
+    adi_manageable: bool
+    adi_guid: str
+    groups: tuple
+    current_risk_score: int
+    risk_score_history: list
+    aliases: list
+    joined_on: str
+    last_sign_in: str
+    status: str
+    organization: str
+    department: str
+    language: str
+    comment: str
+    employee_start_date: str
+    archived_at: str
+    custom_field_1: str
+    custom_field_2: str
+    custom_field_3: str
+    custom_field_4: str
+    custom_date_1: str
+    custom_date_2: str
+
+    _interned = ('job_title', 'location', 'division', 'manager_name', 'manager_email', 'status', 'organization',
+                 'department', 'language')
+
+    @classmethod
+    def _values(cls, obj: dict) -> dict:
+        values = super(UserRecord, cls)._values(obj)
+        values['groups'] = tuple(group.get('group_id', group.get('id')) if isinstance(group, dict) else group
+                                 for group in obj.get('groups') or [])
+        return values
+
+
+@dataclass()
+class EnrollmentRecord(Record):
+
+    __slots__ = ('enrollment_id', 'content_type', 'module_name', 'campaign_name', 'enrollment_date', 'start_date',
+                 'completion_date', 'status', 'time_spent', 'policy_acknowledged', 'user_id', '_config')
+
+    enrollment_id: int
+    content_type: str
+    module_name: str
+    campaign_name: str
+    enrollment_date: str
+    start_date: str
+    completion_date: str
+    status: str
+    time_spent: int
+    policy_acknowledged: bool
+    user_id: int
+
+    _interned = ('content_type', 'module_name', 'campaign_name', 'status')
+
+    @classmethod
+    def _values(cls, obj: dict) -> dict:
+        values = super(EnrollmentRecord, cls)._values(obj)
+        values['status'] = _enrollment_status(obj.get('status'), obj.get('time_spent'))
+        values['user_id'] = (obj.get('user') or {}).get('id')
+        return values
+
+    def __post_init__(self):
+        self._config = None
+
+    @property
+    def user(self):
+        return _resolve_users([self.user_id], self._config)[0]
+
+    @property
+    def email(self):
+        return self.user.email
+
+    @property
+    def firstname(self):
+        return self.user.first_name
+
+    @property
+    def lastname(self):
+        return self.user.last_name
+
+    @property
+    def location(self):
+        return self.user.location
+
+    @property
+    def division(self):
+        return self.user.division
+
+    @property
+    def user_status(self):
+        return self.user.status
+
+    @staticmethod
+    def resolve_users(records: list) -> list:
+
+        """Resolves the users of many records at once, returning them in the same order as ``records``."""
+
+        return _resolve_users([record.user_id for record in records], records[0]._config if records else None)
+
+    @classmethod
+    def _resolve(cls, records: list):
+        cls.resolve_users(records)
+
+
+@dataclass()
+class RecipientRecord(Record):
+
+    __slots__ = ('recipient_id', 'pst_id', 'user_id', 'email', 'first_name', 'last_name', 'template_id',
+                 'template_name', 'scheduled_at', 'delivered_at', 'opened_at', 'clicked_at', 'replied_at',
+                 'attachment_opened_at', 'macro_enabled_at', 'data_entered_at', 'vulnerable_plugins_at', 'exploited_at',
+                 'reported_at', 'bounced_at', 'ip', 'ip_location', 'browser', 'browser_version', 'os')
+
+    recipient_id: int
+    pst_id: int
+    user_id: int
+    email: str
+    first_name: str
+    last_name: str
+    template_id: int
+    template_name: str
+    scheduled_at: str
+    delivered_at: str
+    opened_at: str
+    clicked_at: str
+    replied_at: str
+    attachment_opened_at: str
+    macro_enabled_at: str
+    data_entered_at: str
+    vulnerable_plugins_at: str
+    exploited_at: str
+    reported_at: str
+    bounced_at: str
+    ip: str
+    ip_location: str
+    browser: str
+    browser_version: str
+    os: str
+
+    _interned = ('template_name', 'ip_location', 'browser', 'browser_version', 'os')
+
+    @classmethod
+    def _values(cls, obj: dict) -> dict:
+        values = super(RecipientRecord, cls)._values(obj)
+        user = obj.get('user') or {}
+        template = obj.get('template') or {}
+        values.update({'user_id': user.get('id'), 'email': user.get('email'), 'first_name': user.get('first_name'),
+                       'last_name': user.get('last_name'), 'template_id': template.get('id'),
+                       'template_name': template.get('name')})
+        return values
@@ -0,0 +1,190 @@
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .api import _enrollment_status, _group_id, _relation_ref
+from .columnar import ResultTable
+from .config import ClientConfig
+from .training import Training
+from .users import Users
+
+# The normalized enrollment statuses, in report column order. Any other status gets a column of its own.
+STATUSES = ('Completed', 'In Progress', 'Not Started', 'Past Due')
+
+# counts maps each status to its number of enrollments; groups maps each group ID to such a Counter.
+CampaignCompletion = namedtuple('CampaignCompletion', ['campaign_id', 'name', 'counts', 'groups'])
+
+
+def _row(counts: Counter, statuses: list) -> dict:
+    total = sum(counts.values())
+    row = {'total': total, **{status: counts.get(status, 0) for status in statuses}}
+    row['completion_rate'] = counts.get('Completed', 0) / total if total else 0.0
+    return row
+
+
+class CompletionReport:
+
+    """The training completion of many campaigns, filled in as each campaign's enrollments are tallied.
+
+    :parameter group_names: a dict, group IDs mapped to their names, used to label group rows [Default = None]
+    """
+
+    def __init__(self, group_names: dict = None):
+        self.campaigns = {}
+        self.group_names = group_names or {}
+
+    def add(self, completion: CampaignCompletion):
+        self.campaigns[completion.campaign_id] = completion
+
+    def _statuses(self) -> list:
+        seen = {status for completion in self.campaigns.values() for status in completion.counts}
+        return [*STATUSES, *sorted(seen - set(STATUSES))]
+
+    def by_campaign(self) -> ResultTable:
+
+        """Returns one row per campaign with its enrollment count per status and its completion rate.
+
+        :return: a ResultTable, with campaign_id, campaign_name, total, one column per status and completion_rate
+        :rtype: ResultTable
+        """
+
+        statuses = self._statuses()
+        table = ResultTable()
+        table.extend([{'campaign_id': completion.campaign_id, 'campaign_name': completion.name,
+                       **_row(completion.counts, statuses)} for completion in self.campaigns.values()])
+        return table
+
+    def by_group(self) -> ResultTable:
+
+        """Returns one row per (campaign, group) pair with the enrollment count per status and the completion rate
+        of the group's members.
+
+        :return: a ResultTable, with campaign_id, campaign_name, group_id, group_name, total, one column per status
+        and completion_rate
+        :rtype: ResultTable
+        """
+
+        statuses = self._statuses()
+        table = ResultTable()
+        table.extend([{'campaign_id': completion.campaign_id, 'campaign_name': completion.name, 'group_id': group_id,
+                       'group_name': self.group_names.get(group_id), **_row(counts, statuses)}
+                      for completion in self.campaigns.values()
+                      for group_id, counts in sorted(completion.groups.items())])
+        return table
+
+    def __repr__(self):
+        return f'CompletionReport(campaigns={len(self.campaigns)})'
+
+
+class CompletionReporter:
+
+    """Builds a training completion report across many campaigns.
+
+    The enrollments of up to ``workers`` campaigns are fetched concurrently and tallied as their pages arrive, using
+    the raw records (statuses are normalized the same way TrainingEnrollment normalizes them), so no enrollment
+    objects are hydrated. Group membership comes from the active and archived user lists, read with Users.get
+    alongside the enrollment fetches and shared by every campaign. They go through the process-wide user cache, so
+    lists already loaded by Users.get or enrollment user resolution are not downloaded again. Each enrollment counts
+    towards every group of its user that the campaign is assigned to (or every group of the user, for campaigns
+    without groups).
+
+    :parameter workers: an int, the number of campaigns fetched concurrently [Default = 4]
+    :parameter page_workers: an int, If set, up to this many pages of each campaign are fetched concurrently
+    [Default = None]
+    :parameter by_group: a bool, If False, only per-campaign counts are computed and users are not fetched
+    [Default = True]
+    :parameter config: a ClientConfig, the account to report on [Default = the process-wide client config]
+    """
+
+    def __init__(self, workers: int = 4, page_workers: int = None, by_group: bool = True,
+                 config: ClientConfig = None):
+        self.workers = workers
+        self.page_workers = page_workers
+        self.by_group = by_group
+        self._training = Training(config)
+        self._users = Users(config)
+
+    def _user_groups(self) -> dict:
+
+        # Only the group ids are needed, so the users' group references are read without resolving them.
+        return {user.id: [_group_id(group) for group in _relation_ref(user, 'groups') or []]
+                for status in ['active', 'archived']
+                for user in self._users.get(status=status, workers=self.page_workers)}
+
+    def _tally(self, campaign: dict) -> list:
+
+        """Returns the campaign's enrollment statuses as (user_id, status) pairs."""
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        return [((enrollment.get('user') or {}).get('id'),
+                 _enrollment_status(enrollment.get('status'), enrollment.get('time_spent')))
+                for enrollment in self._training._iter_request(method="GET", url='enrollments',
+                                                               params={'campaign_id': campaign['campaign_id']},
+                                                               workers=self.page_workers)]
+
+    @staticmethod
+    def _completion(campaign: dict, statuses: list, user_groups: dict) -> CampaignCompletion:
+
+        assigned = {_group_id(group) for group in campaign.get('groups') or []}
+        groups = {}
+
+        if user_groups is not None:
+            for user_id, status in statuses:
+                for group_id in user_groups.get(user_id, ()):
+                    if not assigned or group_id in assigned:
+                        groups.setdefault(group_id, Counter())[status] += 1
+
+        return CampaignCompletion(campaign['campaign_id'], campaign.get('name'),
+                                  Counter(status for _, status in statuses), groups)
+
+    def campaigns(self, campaign_ids: list = None) -> list:
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1campaigns/get
+        campaigns = self._training._request(method="GET", url='campaigns')
+
+        if campaign_ids is not None:
+            wanted = set(campaign_ids)
+            campaigns = [campaign for campaign in campaigns if campaign['campaign_id'] in wanted]
+
+        return campaigns
+
+    def iter(self, campaign_ids: list = None):
+
+        """Yields a CampaignCompletion for each campaign as soon as its enrollments are tallied.
+
+        :parameter campaign_ids: a list, the training campaigns to report on [Default = every campaign]
+        :return: a generator of CampaignCompletion objects, in completion order
+        :rtype: generator
+        """
+
+        return self._iter(self.campaigns(campaign_ids))
+
+    def _iter(self, campaigns: list):
+
+        # One extra worker fetches the user list while the campaigns are being fetched.
+        with ThreadPoolExecutor(max_workers=self.workers + (1 if self.by_group else 0)) as executor:
+            users = executor.submit(self._user_groups) if self.by_group else None
+            futures = {executor.submit(self._tally, campaign): campaign for campaign in campaigns}
+
+            for future in as_completed(futures):
+                yield self._completion(futures[future], future.result(), users.result() if users else None)
+
+    def run(self, campaign_ids: list = None, progress=None) -> CompletionReport:
+
+        """Builds the report for every campaign.
+
+        :parameter campaign_ids: a list, the training campaigns to report on [Default = every campaign]
+        :parameter progress: a callable, called with the CompletionReport after each campaign is added, e.g. to
+        render partial results [Default = None]
+        :return: a CompletionReport
+        :rtype: CompletionReport
+        """
+
+        campaigns = self.campaigns(campaign_ids)
+        report = CompletionReport({group['group_id']: group.get('name') for campaign in campaigns
+                                   for group in campaign.get('groups') or [] if isinstance(group, dict)})
+
+        for completion in self._iter(campaigns):
+            report.add(completion)
+            if progress is not None:
+                progress(report)
+
+        return report
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+from .codec import loads
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'last_modified', 'stored_at'])
+
+
+class ResponseCache:
+
+    """A persistent, SQLite-backed cache of raw API responses keyed by endpoint, query parameters and API token.
+
+    Responses carrying an ETag or Last-Modified header are always revalidated with a conditional request, so an
+    unchanged page costs a 304 instead of a full download. Responses without validators are reused until they are
+    older than ``max_age``.
+
+    :parameter path: a str, the SQLite database file to store responses in
+    :parameter max_age: a float, the number of seconds a response without validators is reused [Default = 3600]
+    """
+
+    def __init__(self, path: str, max_age: float = 3600):
+        self._path = path
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB, '
+                                 'etag TEXT, last_modified TEXT, stored_at REAL)')
+        self._connection.commit()
+
+    @staticmethod
+    def key(url: str, params: dict, token: str = None) -> str:
+        token_digest = hashlib.sha256((token or '').encode()).hexdigest()
+        raw = json.dumps([url, sorted((params or {}).items()), token_digest], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute('SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?',
+                                           (key,)).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+
+        """Returns True if ``entry`` can be used without contacting the server."""
+
+        if entry.etag or entry.last_modified:
+            return False
+        return time.time() - entry.stored_at < self._max_age
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict:
+
+        headers = {}
+
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        return headers
+
+    @staticmethod
+    def decode(entry: CachedResponse):
+        return loads(zlib.decompress(entry.body))
+
+    def store(self, key: str, response):
+
+        """Stores a successful response body along with its validators."""
+
+        if response.status_code != 200:
+            return
+
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                                     (key, zlib.compress(response.content), response.headers.get('ETag'),
+                                      response.headers.get('Last-Modified'), time.time()))
+            self._connection.commit()
+
+    def touch(self, key: str):
+
+        """Marks a cached response as revalidated now."""
+
+        with self._lock:
+            self._connection.execute('UPDATE responses SET stored_at = ? WHERE key = ?', (time.time(), key))
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
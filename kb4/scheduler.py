@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+
+    """A thread-safe token bucket limiting how many requests are sent per second.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. Each request consumes one token; when the
+    bucket is empty the caller waits until a token is available.
+
+    :parameter rate: a float, the sustained number of requests allowed per second
+    :parameter capacity: an int, the maximum burst size [Default = rate, rounded up]
+    """
+
+    def __init__(self, rate: float, capacity: int = None):
+        self._rate = rate
+        self._capacity = capacity or max(1, int(rate + 0.999))
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+
+        """Consumes a token and returns how many seconds the caller must wait before using it."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+    def acquire(self):
+
+        """Blocks until a token is available."""
+
+        wait = self.reserve()
+
+        if wait:
+            time.sleep(wait)
+
+
+class RetryPolicy:
+
+    """Decides which failures are retried and how long to wait between attempts.
+
+    Waits honor the server's Retry-After header when present, and otherwise use exponential backoff with full
+    jitter.
+
+    :parameter max_retries: an int, the number of retries after the first attempt [Default = 5]
+    :parameter backoff: a float, the base delay in seconds [Default = 0.5]
+    :parameter max_backoff: a float, the maximum delay in seconds [Default = 60]
+    :parameter statuses: a tuple, the HTTP status codes that are retried [Default = 429 and 5xx gateway errors]
+    """
+
+    def __init__(self, max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 60,
+                 statuses: tuple = (429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def should_retry(self, attempt: int, status_code: int = None) -> bool:
+
+        """Returns True if a request that failed on ``attempt`` (0-based) should be retried. A status_code of None
+        stands for a connection error."""
+
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.statuses
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+
+        """Returns the number of seconds to wait before retrying after ``attempt`` (0-based) failed."""
+
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                from datetime import datetime, timezone
+                from email.utils import parsedate_to_datetime
+
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return min(self.max_backoff, max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+                except (TypeError, ValueError):
+                    pass
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
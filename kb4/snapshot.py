@@ -0,0 +1,336 @@
+import bisect
+import threading
+from .api import Group
+from .config import ClientConfig
+from .groups import Groups
+from .phishing import Phishing
+from .records import EnrollmentRecord, RecipientRecord, UserRecord
+from .training import Training
+from .users import Users
+
+
+class HashIndex:
+
+    """Maps each key to the ids of the entities having it, in insertion order.
+
+    :parameter key: a callable, returns an entity's key (None keys are not indexed)
+    :parameter multi: a bool, If True, ``key`` returns an iterable of keys, e.g. a user's group IDs [Default = False]
+    """
+
+    def __init__(self, key, multi: bool = False):
+        self._key = key
+        self._multi = multi
+        self._ids = {}
+
+    def _keys(self, entity) -> list:
+        key = self._key(entity)
+        keys = (key or ()) if self._multi else [key]
+        return [key for key in keys if key is not None]
+
+    def add(self, entity_id, entity):
+        for key in self._keys(entity):
+            self._ids.setdefault(key, {})[entity_id] = None
+
+    def remove(self, entity_id, entity):
+        for key in self._keys(entity):
+            ids = self._ids.get(key)
+            if ids is not None:
+                ids.pop(entity_id, None)
+                if not ids:
+                    del self._ids[key]
+
+    def get(self, key) -> list:
+        return list(self._ids.get(key, ()))
+
+    def keys(self) -> list:
+        return list(self._ids)
+
+
+class SortedIndex:
+
+    """Keeps entity ids sorted by a key, for range queries in O(log n).
+
+    :parameter key: a callable, returns an entity's key (None keys are not indexed)
+    """
+
+    def __init__(self, key):
+        self._key = key
+        self._entries = []
+
+    def add(self, entity_id, entity):
+        key = self._key(entity)
+        if key is not None:
+            bisect.insort(self._entries, (key, entity_id))
+
+    def remove(self, entity_id, entity):
+        key = self._key(entity)
+        if key is not None:
+            position = bisect.bisect_left(self._entries, (key, entity_id))
+            if position < len(self._entries) and self._entries[position] == (key, entity_id):
+                del self._entries[position]
+
+    def range(self, low=None, high=None) -> list:
+
+        """Returns the ids whose key is between ``low`` and ``high`` (both inclusive), in ascending key order."""
+
+        entries = self._entries
+        start = 0 if low is None else bisect.bisect_left(entries, (low,))
+        end = len(entries) if high is None else bisect.bisect_right(entries, (high, float('inf')))
+        return [entity_id for _, entity_id in entries[start:end]]
+
+
+class SnapshotTable:
+
+    """The entities of one kind, keyed by id, along with their indexes. Replacing an entity updates every index.
+
+    :parameter id_field: a str, the entity attribute holding its id
+    :parameter indexes: HashIndex / SortedIndex objects, keyed by index name
+    """
+
+    def __init__(self, id_field: str, **indexes):
+        self._id_field = id_field
+        self._entities = {}
+        self.indexes = indexes
+
+    def upsert(self, entities: list):
+        for entity in entities:
+            entity_id = getattr(entity, self._id_field)
+            previous = self._entities.get(entity_id)
+
+            if previous is not None:
+                for index in self.indexes.values():
+                    index.remove(entity_id, previous)
+
+            self._entities[entity_id] = entity
+
+            for index in self.indexes.values():
+                index.add(entity_id, entity)
+
+    def remove(self, entity_id):
+        entity = self._entities.pop(entity_id, None)
+        if entity is not None:
+            for index in self.indexes.values():
+                index.remove(entity_id, entity)
+
+    def get(self, entity_id):
+        return self._entities.get(entity_id)
+
+    def lookup(self, index: str, key) -> list:
+
+        """Returns the entities whose ``index`` key equals ``key``."""
+
+        return [self._entities[entity_id] for entity_id in self.indexes[index].get(key)]
+
+    def range(self, index: str, low=None, high=None) -> list:
+
+        """Returns the entities whose ``index`` key is between ``low`` and ``high``, in ascending key order."""
+
+        return [self._entities[entity_id] for entity_id in self.indexes[index].range(low, high)]
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __iter__(self):
+        return iter(list(self._entities.values()))
+
+
+def _email(entity):
+    return entity.email.lower() if entity.email else None
+
+
+class TenantSnapshot:
+
+    """An indexed, in-memory copy of a tenant's users, groups, training enrollments and phishing recipients.
+
+    Users, enrollments and recipients are kept as compact Record objects, which reference users and groups by id;
+    the indexes turn lookups such as "users in group X", "user by email" or "enrollments for manager Y" into dict
+    hits (and risk score ranges into binary searches) instead of list scans. A snapshot can be filled page by page
+    with ``add`` as results arrive, and kept current by subscribing ``apply`` to a SyncEngine.
+
+    User indexes: email (lower-cased), group, manager_email (lower-cased), division, status, risk_score (sorted).
+    Group indexes: status. Enrollment indexes: user, status, campaign_name. Recipient indexes: user, pst.
+
+    :parameter config: a ClientConfig, the account enrollments resolve their users with
+    [Default = the process-wide client config]
+    """
+
+    # Each kind's record type and the field holding its id.
+    kinds = {'users': (UserRecord, 'id'), 'groups': (Group, 'id'), 'enrollments': (EnrollmentRecord, 'enrollment_id'),
+             'recipients': (RecipientRecord, 'recipient_id')}
+
+    def __init__(self, config: ClientConfig = None):
+        self._config = config
+        self._lock = threading.RLock()
+        self.users = SnapshotTable('id',
+                                   email=HashIndex(_email),
+                                   group=HashIndex(lambda user: user.groups, multi=True),
+                                   manager_email=HashIndex(lambda user: (user.manager_email or '').lower() or None),
+                                   division=HashIndex(lambda user: user.division),
+                                   status=HashIndex(lambda user: user.status),
+                                   risk_score=SortedIndex(lambda user: user.current_risk_score))
+        self.groups = SnapshotTable('id', status=HashIndex(lambda group: group.status))
+        self.enrollments = SnapshotTable('enrollment_id',
+                                         user=HashIndex(lambda enrollment: enrollment.user_id),
+                                         status=HashIndex(lambda enrollment: enrollment.status),
+                                         campaign_name=HashIndex(lambda enrollment: enrollment.campaign_name))
+        self.recipients = SnapshotTable('recipient_id',
+                                        user=HashIndex(lambda recipient: recipient.user_id),
+                                        pst=HashIndex(lambda recipient: recipient.pst_id))
+
+    @classmethod
+    def load(cls, config: ClientConfig = None, kinds: list = None, phishing_security_test_ids: list = None,
+             workers: int = None) -> 'TenantSnapshot':
+
+        """Builds a snapshot from one bulk fetch of each kind, indexing every page as soon as it arrives.
+
+        :parameter config: a ClientConfig, the account to load [Default = the process-wide client config]
+        :parameter kinds: a list, the kinds to load (users / groups / enrollments / recipients) [Default = all]
+        :parameter phishing_security_test_ids: a list, the PSTs whose recipients are loaded [Default = every PST]
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a TenantSnapshot
+        :rtype: TenantSnapshot
+        """
+
+        for kind in kinds or []:
+            if kind not in cls.kinds:
+                raise ValueError(f'{kind} is an invalid value for kinds. Possible values: {list(cls.kinds)}')
+
+        kinds = kinds or list(cls.kinds)
+        snapshot = cls(config)
+
+        # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users/get
+        if 'users' in kinds:
+            users = Users(config)
+            for status in ['active', 'archived']:
+                for records in users._iter_pages(method="GET", url="", params={'status': status}, workers=workers):
+                    snapshot.add('users', records)
+
+        # https://developer.knowbe4.com/reporting/#tag/Groups/paths/~1v1~1groups/get
+        if 'groups' in kinds:
+            groups = Groups(config)
+            for status in ['active', 'archived']:
+                for records in groups._iter_pages(method="GET", url="", params={'status': status}):
+                    snapshot.add('groups', records)
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        if 'enrollments' in kinds:
+            for records in Training(config)._iter_pages(method="GET", url='enrollments', workers=workers):
+                snapshot.add('enrollments', records)
+
+        if 'recipients' in kinds:
+            phishing = Phishing(config)
+            pst_ids = phishing_security_test_ids
+            if pst_ids is None:
+                # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
+                pst_ids = [pst['pst_id'] for pst in phishing._request(method="GET", url='security_tests')]
+
+            for pst_id in pst_ids:
+                # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+                for records in phishing._iter_pages(method="GET", url=f'security_tests/{pst_id}/recipients',
+                                                    workers=workers):
+                    snapshot.add('recipients', records)
+
+        return snapshot
+
+    def _table(self, kind: str) -> SnapshotTable:
+        if kind not in self.kinds:
+            raise ValueError(f'{kind} is an invalid value for kind. Possible values: {list(self.kinds)}')
+        return getattr(self, kind)
+
+    def add(self, kind: str, records: list):
+
+        """Adds or replaces entities from raw JSON records, e.g. a page that just arrived.
+
+        :parameter kind: a str, the entity kind (users / groups / enrollments / recipients)
+        :parameter records: a list, raw JSON records of that kind
+        """
+
+        table = self._table(kind)
+        record_cls = self.kinds[kind][0]
+
+        if record_cls is Group:
+            entities = [Group.from_dict(record) for record in records]
+        else:
+            entities = record_cls.from_dicts(records, config=self._config)
+
+        with self._lock:
+            table.upsert(entities)
+
+    def remove(self, kind: str, entity_id: int):
+        table = self._table(kind)
+        with self._lock:
+            table.remove(entity_id)
+
+    def apply(self, change):
+
+        """Applies a SyncEngine ChangeEvent, so ``engine.subscribe(snapshot.apply)`` keeps the snapshot current."""
+
+        if change.action == 'deleted':
+            self.remove(change.kind, change.id)
+        else:
+            self.add(change.kind, [change.record])
+
+    def user(self, user_id: int) -> UserRecord:
+        return self.users.get(user_id)
+
+    def user_by_email(self, email: str) -> UserRecord:
+        with self._lock:
+            users = self.users.lookup('email', email.lower())
+        return users[0] if users else None
+
+    def users_in_group(self, group_id: int) -> list:
+        with self._lock:
+            return self.users.lookup('group', group_id)
+
+    def users_by_manager(self, manager_email: str) -> list:
+        with self._lock:
+            return self.users.lookup('manager_email', manager_email.lower())
+
+    def users_by_division(self, division: str) -> list:
+        with self._lock:
+            return self.users.lookup('division', division)
+
+    def users_by_risk(self, low: float = None, high: float = None) -> list:
+
+        """Returns the users whose current risk score is between ``low`` and ``high`` (inclusive), lowest first."""
+
+        with self._lock:
+            return self.users.range('risk_score', low, high)
+
+    def groups_of(self, user_id: int) -> list:
+
+        user = self.users.get(user_id)
+
+        if user is None:
+            return []
+
+        return [group for group in (self.groups.get(group_id) for group_id in user.groups) if group is not None]
+
+    def enrollments_for_user(self, user_id: int) -> list:
+        with self._lock:
+            return self.enrollments.lookup('user', user_id)
+
+    def enrollments_for_manager(self, manager_email: str) -> list:
+
+        """Returns the training enrollments of every user reporting to ``manager_email``."""
+
+        with self._lock:
+            return [enrollment for user in self.users.lookup('manager_email', manager_email.lower())
+                    for enrollment in self.enrollments.lookup('user', user.id)]
+
+    def enrollments_for_group(self, group_id: int) -> list:
+        with self._lock:
+            return [enrollment for user in self.users.lookup('group', group_id)
+                    for enrollment in self.enrollments.lookup('user', user.id)]
+
+    def recipients_for_user(self, user_id: int) -> list:
+        with self._lock:
+            return self.recipients.lookup('user', user_id)
+
+    def recipients_for_pst(self, pst_id: int) -> list:
+        with self._lock:
+            return self.recipients.lookup('pst', pst_id)
+
+    def __repr__(self):
+        return (f'TenantSnapshot(users={len(self.users)}, groups={len(self.groups)}, '
+                f'enrollments={len(self.enrollments)}, recipients={len(self.recipients)})')
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+from .config import ClientConfig
+from .groups import Groups
+from .phishing import Phishing
+from .training import Training
+from .users import Users
+
+# action is 'created', 'updated' or 'deleted'; record is the new raw record (None when deleted) and previous the
+# stored one (None when created).
+ChangeEvent = namedtuple('ChangeEvent', ['kind', 'action', 'id', 'record', 'previous'])
+
+
+class SyncStore:
+
+    """A local SQLite copy of tenant entities, used by SyncEngine to detect what changed between runs.
+
+    Each entity is stored as its raw JSON record together with a digest of it, grouped by kind (users, groups,
+    enrollments, recipients) and scope (e.g. the PST a recipient belongs to). The store also keeps the last seen
+    state of each scope.
+
+    :parameter path: a str, the SQLite database file [Default = in-memory]
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS entities (kind TEXT, scope TEXT, id INTEGER, digest TEXT, body TEXT,
+                                                 PRIMARY KEY (kind, id));
+            CREATE INDEX IF NOT EXISTS entities_scope ON entities (kind, scope);
+            CREATE TABLE IF NOT EXISTS scopes (kind TEXT, scope TEXT, state TEXT, PRIMARY KEY (kind, scope));
+        ''')
+        self._connection.commit()
+
+    @staticmethod
+    def digest(record: dict) -> str:
+        return hashlib.blake2b(json.dumps(record, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+    def digests(self, kind: str, scope: str = '') -> dict:
+
+        """Returns the stored digest of every entity of ``kind`` in ``scope``, keyed by id."""
+
+        with self._lock:
+            return dict(self._connection.execute('SELECT id, digest FROM entities WHERE kind = ? AND scope = ?',
+                                                 (kind, scope)))
+
+    def get(self, kind: str, entity_id: int):
+        with self._lock:
+            row = self._connection.execute('SELECT body FROM entities WHERE kind = ? AND id = ?',
+                                           (kind, entity_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all(self, kind: str) -> list:
+        with self._lock:
+            rows = self._connection.execute('SELECT body FROM entities WHERE kind = ? ORDER BY id', (kind,)).fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def scopes(self, kind: str) -> set:
+
+        """Returns every scope of ``kind`` that has stored entities or a stored state."""
+
+        with self._lock:
+            rows = self._connection.execute('SELECT scope FROM entities WHERE kind = ? UNION '
+                                            'SELECT scope FROM scopes WHERE kind = ?', (kind, kind)).fetchall()
+        return {scope for scope, in rows}
+
+    def scope_state(self, kind: str, scope: str):
+        with self._lock:
+            row = self._connection.execute('SELECT state FROM scopes WHERE kind = ? AND scope = ?',
+                                           (kind, scope)).fetchone()
+        return row[0] if row else None
+
+    def apply(self, kind: str, scope: str, upserts: list, deletes: list, state: str = None):
+
+        """Writes one sync run's changes in a single transaction.
+
+        :parameter kind: a str, the entity kind
+        :parameter scope: a str, the scope the changes belong to
+        :parameter upserts: a list, (id, digest, record) tuples to insert or replace
+        :parameter deletes: a list, ids to remove
+        :parameter state: a str, the scope's state at the end of the run (e.g. a PST's status) [Default = None]
+        """
+
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)',
+                                         [(kind, scope, entity_id, digest, json.dumps(record, default=str))
+                                          for entity_id, digest, record in upserts])
+            self._connection.executemany('DELETE FROM entities WHERE kind = ? AND id = ?',
+                                         [(kind, entity_id) for entity_id in deletes])
+            if state is not None:
+                self._connection.execute('INSERT OR REPLACE INTO scopes VALUES (?, ?, ?)', (kind, scope, state))
+
+    def drop_scope(self, kind: str, scope: str):
+
+        """Forgets the stored state of a scope, e.g. a PST the API no longer returns."""
+
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM scopes WHERE kind = ? AND scope = ?', (kind, scope))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SyncEngine:
+
+    """Keeps a SyncStore up to date with the tenant and reports what changed as ChangeEvent objects.
+
+    This is a full-diff sync: the KnowBe4 reporting API has no modified-since filters, so users, groups and
+    enrollments are pulled in full on every run and diffed against the stored snapshot by digest; only the
+    differences are written and emitted. Configure a ResponseCache on the transport to turn unchanged pages into 304
+    responses. Recipients are synced per phishing security test, tests that were already synced after they closed
+    are skipped entirely, and the recipients of tests the API no longer returns are deleted.
+
+    :parameter store: a SyncStore, the local snapshot to diff against
+    :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+    :parameter config: a ClientConfig, the account to sync [Default = the process-wide client config]
+    """
+
+    def __init__(self, store: SyncStore, workers: int = None, config: ClientConfig = None):
+        self.store = store
+        self.workers = workers
+        self._listeners = []
+        self._users = Users(config)
+        self._groups = Groups(config)
+        self._training = Training(config)
+        self._phishing = Phishing(config)
+
+    def subscribe(self, listener):
+
+        """Registers a callable invoked with every ChangeEvent as soon as its run is written to the store."""
+
+        self._listeners.append(listener)
+
+    def _diff(self, kind: str, key: str, records, scope: str = '', state: str = None) -> list:
+
+        stored = self.store.digests(kind, scope)
+        upserts, events, seen = [], [], set()
+
+        for record in records:
+            entity_id = record[key]
+
+            # Pages can shift while they are being read, so the same record may show up twice.
+            if entity_id in seen:
+                continue
+
+            seen.add(entity_id)
+            digest = self.store.digest(record)
+            previous_digest = stored.get(entity_id)
+
+            if previous_digest != digest:
+                upserts.append((entity_id, digest, record))
+                events.append((entity_id, record, 'created' if previous_digest is None else 'updated'))
+
+        deletes = [entity_id for entity_id in stored if entity_id not in seen]
+
+        changes = [ChangeEvent(kind, action, entity_id, record,
+                               self.store.get(kind, entity_id) if action == 'updated' else None)
+                   for entity_id, record, action in events]
+        changes += [ChangeEvent(kind, 'deleted', entity_id, None, self.store.get(kind, entity_id))
+                    for entity_id in deletes]
+
+        self.store.apply(kind, scope, upserts, deletes, state=state)
+
+        for change in changes:
+            for listener in self._listeners:
+                listener(change)
+
+        return changes
+
+    def sync_users(self) -> list:
+
+        """Syncs active and archived users.
+
+        :return: a list, ChangeEvent objects for every created, updated or deleted user
+        :rtype: list
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users/get
+        records = (user for status in ['active', 'archived']
+                   for user in self._users._iter_request(method="GET", url="", params={'status': status},
+                                                         workers=self.workers))
+        return self._diff('users', 'id', records)
+
+    def sync_groups(self) -> list:
+
+        """Syncs active and archived groups.
+
+        :return: a list, ChangeEvent objects for every created, updated or deleted group
+        :rtype: list
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Groups/paths/~1v1~1groups/get
+        records = (group for status in ['active', 'archived']
+                   for group in self._groups._iter_request(method="GET", url="", params={'status': status}))
+        return self._diff('groups', 'id', records)
+
+    def sync_enrollments(self) -> list:
+
+        """Syncs training enrollments.
+
+        :return: a list, ChangeEvent objects for every created, updated or deleted enrollment
+        :rtype: list
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        records = self._training._iter_request(method="GET", url='enrollments', workers=self.workers)
+        return self._diff('enrollments', 'enrollment_id', records)
+
+    def sync_recipients(self, phishing_security_test_ids: list = None) -> list:
+
+        """Syncs phishing security test recipients. Tests whose recipients were synced after the test closed are
+        skipped, since their results no longer change, and the stored recipients of tests the API no longer returns
+        are deleted.
+
+        :parameter phishing_security_test_ids: a list, the PSTs to sync [Default = every PST in the account]
+        :return: a list, ChangeEvent objects for every created, updated or deleted recipient
+        :rtype: list
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests/get
+        psts = self._phishing._request(method="GET", url='security_tests')
+
+        stale = self.store.scopes('recipients') - {str(pst['pst_id']) for pst in psts}
+
+        if phishing_security_test_ids is not None:
+            wanted = set(phishing_security_test_ids)
+            psts = [pst for pst in psts if pst['pst_id'] in wanted]
+            stale &= {str(pst_id) for pst_id in wanted}
+
+        changes = []
+
+        for scope in sorted(stale):
+            changes += self._diff('recipients', 'recipient_id', [], scope=scope)
+            self.store.drop_scope('recipients', scope)
+
+        for pst in psts:
+            scope = str(pst['pst_id'])
+
+            if self.store.scope_state('recipients', scope) == 'Closed':
+                continue
+
+            # https://developer.knowbe4.com/reporting/#tag/Phishing/paths/~1v1~1phishing~1security_tests~1{pst_id}~1recipients/get
+            records = self._phishing._iter_request(method="GET", url=f'security_tests/{pst["pst_id"]}/recipients',
+                                                   workers=self.workers)
+            changes += self._diff('recipients', 'recipient_id', records, scope=scope, state=pst.get('status'))
+
+        return changes
+
+    def sync(self, kinds: list = None) -> list:
+
+        """Syncs several entity kinds in turn.
+
+        :parameter kinds: a list, the kinds to sync (users / groups / enrollments / recipients) [Default = all]
+        :return: a list, ChangeEvent objects for every change found
+        :rtype: list
+        """
+
+        handlers = {'users': self.sync_users, 'groups': self.sync_groups, 'enrollments': self.sync_enrollments,
+                    'recipients': self.sync_recipients}
+
+        for kind in kinds or []:
+            if kind not in handlers:
+                raise ValueError(f'{kind} is an invalid value for kinds. Possible values: {list(handlers)}')
+
+        return [change for kind in kinds or list(handlers) for change in handlers[kind]()]
@@ -1,10 +1,22 @@
-from .api import API, StorePurchase, Policy, TrainingCampaign, TrainingEnrollment
+from .api import API, StorePurchase, Policy, TrainingCampaign, TrainingEnrollment, _enrollment_status
+from .config import ClientConfig
+from .columnar import ResultTable
+from .query import Query
+from .records import EnrollmentRecord
+
+
+def _normalize_enrollment_status(record: dict) -> dict:
+
+    """Normalizes a raw enrollment's status the same way TrainingEnrollment does."""
+
+    record['status'] = _enrollment_status(record.get('status'), record.get('time_spent'))
+    return record
 
 
 class Training(API):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: ClientConfig = None):
+        super().__init__(config)
         self._domain = f'{self._domain}/training'
 
     def get_store_purchases(self, store_purchase_id: int = None) -> list:
@@ -48,12 +60,14 @@ class Training(API):
         else:
             return [Policy.from_dict(policy) for policy in self._request(method="GET", url=f'policies')]
 
-    def get_campaigns(self, campaign_id: int = None) -> list:
+    def get_campaigns(self, campaign_id: int = None, eager: bool = False) -> list:
 
         """Retrieves all training campaigns (or a specific training campaign if a campaign_id is provided) in your
         KnowBe4 account.
 
         :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
@@ -61,17 +75,18 @@ class Training(API):
         # Get a Specific Training Campaign:
         # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1campaigns~1{campaign_id}/get
         if campaign_id:
-            return [TrainingCampaign.from_dict(training_campaign)
-                    for training_campaign in self._request(method="GET", url=f'campaigns/{campaign_id}')]
+            return TrainingCampaign.from_dicts(self._request(method="GET", url=f'campaigns/{campaign_id}'),
+                                               eager=eager, config=self._config)
 
         # Get All Training Campaigns:
         # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1campaigns/get
         else:
-            return [TrainingCampaign.from_dict(training_campaign)
-                    for training_campaign in self._request(method="GET", url=f'campaigns')]
+            return TrainingCampaign.from_dicts(self._request(method="GET", url=f'campaigns'), eager=eager,
+                                               config=self._config)
 
     def get_enrollments(self, enrollment_id: int = None, store_purchase_id: int = None,
-                        campaign_id: int = None, user_id: int = None) -> list:
+                        campaign_id: int = None, user_id: int = None, workers: int = None,
+                        eager: bool = False, compact: bool = False) -> list:
 
         """Retrieves all training enrollments (or a specific training enrollment if a enrollment_id is provided) in
         your KnowBe4 account.
@@ -80,10 +95,120 @@ class Training(API):
         :parameter store_purchase_id: an int, a store purchase ID to filter on
         :parameter campaign_id: an int, a training campaign ID to filter on
         :parameter user_id: an int, a user ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
+        :parameter compact: a bool, If True, compact slotted EnrollmentRecord objects are returned instead
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
 
+        datacls = EnrollmentRecord if compact else TrainingEnrollment
+
+        # Get a Specific Training Enrollment
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments~1{enrollment_id}/get
+        if enrollment_id:
+            return datacls.from_dicts(self._request(method="GET", url=f'enrollments/{enrollment_id}'), eager=eager,
+                                      config=self._config)
+
+        # Get All Training Enrollments
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        else:
+            params = self._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                             user_id=user_id)
+
+            return datacls.from_dicts(self._request(method="GET", url=f'enrollments', params=params, workers=workers),
+                                      eager=eager, config=self._config)
+
+    def iter_enrollments(self, store_purchase_id: int = None, campaign_id: int = None, user_id: int = None,
+                         workers: int = None, eager: bool = False, compact: bool = False):
+
+        """Yields all training enrollments in your KnowBe4 account page by page, so only one page is held in memory
+        at a time.
+
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter user_id: an int, a user ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
+        :parameter compact: a bool, If True, compact slotted EnrollmentRecord objects are returned instead
+        [Default = False]
+        :return: a generator of TrainingEnrollment objects
+        :rtype: generator
+        """
+
+        params = self._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                         user_id=user_id)
+        datacls = EnrollmentRecord if compact else TrainingEnrollment
+
+        return (training_enrollment
+                for training_enrollments in self._iter_pages(method="GET", url=f'enrollments', params=params,
+                                                             workers=workers)
+                for training_enrollment in datacls.from_dicts(training_enrollments, eager=eager, config=self._config))
+
+    def get_enrollments_table(self, store_purchase_id: int = None, campaign_id: int = None, user_id: int = None,
+                              workers: int = None) -> ResultTable:
+
+        """Retrieves all training enrollments in your KnowBe4 account as a column-oriented ResultTable, built directly
+        from the API pages. The nested user is flattened into user_id / user_email / ... columns and statuses are
+        normalized the same way TrainingEnrollment normalizes them.
+
+        :parameter store_purchase_id: an int, a store purchase ID to filter on
+        :parameter campaign_id: an int, a training campaign ID to filter on
+        :parameter user_id: an int, a user ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a ResultTable, convertible with to_pandas / to_arrow / to_parquet
+        :rtype: ResultTable
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        params = self._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                         user_id=user_id)
+
+        return self._table(url='enrollments', params=params, workers=workers, transform=_normalize_enrollment_status)
+
+    def query_campaigns(self) -> Query:
+
+        """Starts a query over the training campaigns in your KnowBe4 account. Every filter is applied to the raw
+        campaigns before they are hydrated, so the groups of campaigns that do not match are never resolved.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1campaigns/get
+        return Query(self, route=lambda: ('campaigns', None), datacls=TrainingCampaign)
+
+    def query_enrollments(self) -> Query:
+
+        """Starts a query over the training enrollments in your KnowBe4 account, e.g.
+        ``training.query_enrollments().where(campaign_id=42, status__in=['Not Started', 'In Progress']).all()``.
+
+        store_purchase_id, campaign_id and user_id filters are sent to the API. Every other filter is applied to
+        each page before it is hydrated, after statuses are normalized the same way TrainingEnrollment normalizes
+        them. email, firstname and lastname are read from the enrollment's user; fields that need the full user
+        (location, division, user_status) cannot be filtered on.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        return Query(self, route=self._enrollments_route, datacls=TrainingEnrollment, record_cls=EnrollmentRecord,
+                     pushdown=['store_purchase_id', 'campaign_id', 'user_id'], transform=_normalize_enrollment_status,
+                     aliases={'email': ('user', 'email'), 'firstname': ('user', 'first_name'),
+                              'lastname': ('user', 'last_name')})
+
+    def _enrollments_route(self, store_purchase_id: int = None, campaign_id: int = None, user_id: int = None) -> tuple:
+
+        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
+        return 'enrollments', self._enrollment_params(store_purchase_id=store_purchase_id, campaign_id=campaign_id,
+                                                      user_id=user_id)
+
+    @staticmethod
+    def _enrollment_params(store_purchase_id: int = None, campaign_id: int = None, user_id: int = None) -> dict:
+
         params = {}
 
         if store_purchase_id:
@@ -93,14 +218,4 @@ class Training(API):
         if user_id:
             params.update({'user_id': user_id})
 
-        # Get a Specific Training Enrollment
-        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments~1{enrollment_id}/get
-        if enrollment_id:
-            return [TrainingEnrollment.from_dict(training_enrollment)
-                    for training_enrollment in self._request(method="GET", url=f'enrollments/{enrollment_id}')]
-
-        # Get All Training Enrollments
-        # https://developer.knowbe4.com/reporting/#tag/Training/paths/~1v1~1training~1enrollments/get
-        else:
-            return [TrainingEnrollment.from_dict(training_enrollment)
-                    for training_enrollment in self._request(method="GET", url=f'enrollments', params=params)]
+        return params
@@ -0,0 +1,169 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+from .metrics import endpoint, get_metrics
+from .scheduler import RetryPolicy, TokenBucket
+
+if TYPE_CHECKING:
+    import requests
+    from .response_cache import ResponseCache
+
+
+class Transport:
+
+    """A thread-safe, pooled HTTP layer shared by every API client.
+
+    A single ``requests.Session`` is built lazily on first use (requests itself is only imported then) and reused
+    for every page fetch, so TCP and TLS connections are kept alive between requests instead of being re-negotiated
+    for each page. Every request first takes a token from the shared rate limiter (if one is configured), and 429 /
+    5xx responses and connection errors are retried according to the retry policy, so a transient failure
+    mid-pagination only repeats the failed page.
+
+    :parameter pool_size: an int, the maximum number of connections kept open per host [Default = 10]
+    :parameter keep_alive: a bool, If False, connections are closed after every request [Default = True]
+    :parameter gzip: a bool, If True, compressed responses are requested from the server [Default = True]
+    :parameter response_cache: a ResponseCache, an optional persistent cache consulted for GET requests
+    [Default = None]
+    :parameter rate_limiter: a TokenBucket, an optional request budget shared by every client using this transport
+    [Default = None]
+    :parameter retry: a RetryPolicy, which failures are retried and how long to wait [Default = RetryPolicy()]
+    """
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True, gzip: bool = True,
+                 response_cache: 'ResponseCache' = None, rate_limiter: TokenBucket = None, retry: RetryPolicy = None):
+        self._pool_size = pool_size
+        self._keep_alive = keep_alive
+        self._gzip = gzip
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry or RetryPolicy()
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> 'requests.Session':
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        session.headers.update({
+            'Connection': 'keep-alive' if self._keep_alive else 'close',
+            'Accept-Encoding': 'gzip, deflate' if self._gzip else 'identity',
+        })
+
+        return session
+
+    def configure(self, pool_size: int = None, keep_alive: bool = None, gzip: bool = None,
+                  response_cache: 'ResponseCache' = None, rate_limiter: TokenBucket = None,
+                  retry: RetryPolicy = None):
+
+        """Updates the transport settings. The current session is closed and a new one is built on the next request.
+
+        :parameter pool_size: an int, the maximum number of connections kept open per host
+        :parameter keep_alive: a bool, If False, connections are closed after every request
+        :parameter gzip: a bool, If True, compressed responses are requested from the server
+        :parameter response_cache: a ResponseCache, a persistent cache consulted for GET requests
+        :parameter rate_limiter: a TokenBucket, a request budget shared by every client using this transport
+        :parameter retry: a RetryPolicy, which failures are retried and how long to wait
+        """
+
+        with self._lock:
+            if response_cache is not None:
+                self.response_cache = response_cache
+            if rate_limiter is not None:
+                self.rate_limiter = rate_limiter
+            if retry is not None:
+                self.retry = retry
+            if pool_size is not None:
+                self._pool_size = pool_size
+            if keep_alive is not None:
+                self._keep_alive = keep_alive
+            if gzip is not None:
+                self._gzip = gzip
+            self._close()
+
+    def request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+
+        import requests
+
+        metrics = get_metrics()
+        path = endpoint(url)
+        attempt = 0
+
+        while True:
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            started = time.perf_counter()
+
+            try:
+                response = self.session.request(method=method, url=url, **kwargs)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                metrics.observe('kb4_request_seconds', time.perf_counter() - started, endpoint=path,
+                                method=method.upper(), status='error')
+                if not self.retry.should_retry(attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+                reason = 'connection'
+
+            else:
+                metrics.observe('kb4_request_seconds', time.perf_counter() - started, endpoint=path,
+                                method=method.upper(), status=str(response.status_code))
+                if not self.retry.should_retry(attempt, response.status_code):
+                    metrics.observe('kb4_response_bytes', len(response.content), endpoint=path)
+                    return response
+                delay = self.retry.delay(attempt, response.headers.get('Retry-After'))
+                reason = str(response.status_code)
+
+            metrics.increment('kb4_retries', endpoint=path, reason=reason)
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_DEFAULT_TRANSPORT = Transport()
+
+
+def get_transport() -> Transport:
+    return _DEFAULT_TRANSPORT
+
+
+def configure_transport(pool_size: int = None, keep_alive: bool = None, gzip: bool = None,
+                        response_cache: 'ResponseCache' = None, rate_limiter: TokenBucket = None,
+                        retry: RetryPolicy = None):
+
+    """Updates the process-wide transport shared by Training, Users, Groups, Phishing and Account.
+
+    :parameter pool_size: an int, the maximum number of connections kept open per host
+    :parameter keep_alive: a bool, If False, connections are closed after every request
+    :parameter gzip: a bool, If True, compressed responses are requested from the server
+    :parameter response_cache: a ResponseCache, a persistent cache consulted for GET requests
+    :parameter rate_limiter: a TokenBucket, a request budget shared by every KB4 sub-client and thread
+    :parameter retry: a RetryPolicy, which failures are retried and how long to wait
+    """
+
+    _DEFAULT_TRANSPORT.configure(pool_size=pool_size, keep_alive=keep_alive, gzip=gzip,
+                                 response_cache=response_cache, rate_limiter=rate_limiter, retry=retry)
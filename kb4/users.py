@@ -1,13 +1,18 @@
-from .api import API, User
+from .api import API, User, _cached_users, _resolve_relations, _store_users
+from .config import ClientConfig
+from .columnar import ResultTable
+from .query import Query
+from .records import UserRecord
 
 
 class Users(API):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, config: ClientConfig = None):
+        super().__init__(config)
         self._domain = f'{self._domain}/users'
 
-    def get(self, status: str = 'active', group_id: int = None, user_id: int = None, expand: bool = False) -> list:
+    def get(self, status: str = 'active', group_id: int = None, user_id: int = None, expand: bool = False,
+            workers: int = None, eager: bool = False, compact: bool = False) -> list:
 
         """Retrieves all users (or a specific user if a user_id is provided) in your KnowBe4 account
 
@@ -15,31 +20,121 @@ class Users(API):
         :parameter group_id: a str, A group ID to filter on
         :parameter user_id: an int, A user ID to filter on
         :parameter expand: a bool, If true, expands groups to provide additional details [Default = False]
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
+        :parameter compact: a bool, If True, compact slotted UserRecord objects are returned instead
+        [Default = False]
         :return: a list, API response(s)
         :rtype: list
         """
 
-        params = {}
+        datacls = UserRecord if compact else User
 
         # Get a Specific User
         # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users~1{user_id}/get
         if user_id:
-            return [User.from_dict(user) for user in self._request(method="GET", url=f'{user_id}')]
+            return datacls.from_dicts(self._request(method="GET", url=f'{user_id}'), eager=eager, config=self._config)
 
         # Get All Users:
         # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users/get
         else:
-            if group_id:
-                params.update({'group_id': group_id})
-            if status.lower() not in ['archived', 'active']:
-                raise ValueError(f'{status} is an invalid value for status. Possible values: '
-                                 f'["active", "archived"]')
-            else:
-                if status.lower() == 'archived':
-                    params.update({'status': 'archived'})
-                elif status.lower() == 'active':
-                    params.update({'status': 'active'})
-            if expand:
-                params.update({'expand': 'group'})
-
-            return [User.from_dict(user) for user in self._request(method="GET", url="", params=params)]
+            params = self._user_params(status=status, group_id=group_id, expand=expand)
+
+            # The unfiltered user list is shared with the user resolution of TrainingEnrollment objects, so it is
+            # downloaded at most once per cache TTL.
+            shared = not group_id and not expand and not compact
+
+            if shared:
+                users = _cached_users(params['status'], caches=self._caches)
+                if users is not None:
+                    if eager:
+                        _resolve_relations(users, self._config)
+                    return users
+
+            users = datacls.from_dicts(self._request(method="GET", url="", params=params, workers=workers),
+                                       eager=eager, config=self._config)
+
+            if shared:
+                _store_users(users, status=params['status'], caches=self._caches)
+
+            return users
+
+    def iter(self, status: str = 'active', group_id: int = None, expand: bool = False, workers: int = None,
+             eager: bool = False, compact: bool = False):
+
+        """Yields all users in your KnowBe4 account page by page, so only one page is held in memory at a time.
+
+        :parameter status: a str, Filter results based on status (active / archived) [Default = active]
+        :parameter group_id: a str, A group ID to filter on
+        :parameter expand: a bool, If true, expands groups to provide additional details [Default = False]
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :parameter eager: a bool, If True, related objects are resolved immediately instead of on first access
+        [Default = False]
+        :parameter compact: a bool, If True, compact slotted UserRecord objects are returned instead
+        [Default = False]
+        :return: a generator of User objects
+        :rtype: generator
+        """
+
+        params = self._user_params(status=status, group_id=group_id, expand=expand)
+        datacls = UserRecord if compact else User
+
+        return (user for users in self._iter_pages(method="GET", url="", params=params, workers=workers)
+                for user in datacls.from_dicts(users, eager=eager, config=self._config))
+
+    def get_table(self, status: str = 'active', group_id: int = None, workers: int = None) -> ResultTable:
+
+        """Retrieves all users in your KnowBe4 account as a column-oriented ResultTable, built directly from the API
+        pages. The groups column keeps the raw list of group IDs.
+
+        :parameter status: a str, Filter results based on status (active / archived) [Default = active]
+        :parameter group_id: a str, A group ID to filter on
+        :parameter workers: an int, If set, up to this many pages are fetched concurrently [Default = None]
+        :return: a ResultTable, convertible with to_pandas / to_arrow / to_parquet
+        :rtype: ResultTable
+        """
+
+        # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users/get
+        return self._table(url="", params=self._user_params(status=status, group_id=group_id), workers=workers)
+
+    def query(self) -> Query:
+
+        """Starts a query over the users in your KnowBe4 account, e.g.
+        ``users.query().where(status='archived', location='Berlin').select('id', 'email').all()``.
+
+        status (active / archived) and group_id filters are sent to the API; status defaults to active, and other
+        status conditions (e.g. status__ne) request both lists. Every other filter is applied to each page before it
+        is hydrated.
+
+        :return: a Query, evaluated with iter / all / first / count / table
+        :rtype: Query
+        """
+
+        return Query(self, route=self._query_route, datacls=User, record_cls=UserRecord,
+                     pushdown=['status', 'group_id'], domains={'status': ['active', 'archived']})
+
+    def _query_route(self, status: str = 'active', group_id: int = None) -> tuple:
+
+        # https://developer.knowbe4.com/reporting/#tag/Users/paths/~1v1~1users/get
+        return "", self._user_params(status=status, group_id=group_id)
+
+    @staticmethod
+    def _user_params(status: str = 'active', group_id: int = None, expand: bool = False) -> dict:
+
+        params = {}
+
+        if group_id:
+            params.update({'group_id': group_id})
+        if status.lower() not in ['archived', 'active']:
+            raise ValueError(f'{status} is an invalid value for status. Possible values: '
+                             f'["active", "archived"]')
+        else:
+            if status.lower() == 'archived':
+                params.update({'status': 'archived'})
+            elif status.lower() == 'active':
+                params.update({'status': 'active'})
+        if expand:
+            params.update({'expand': 'group'})
+
+        return params